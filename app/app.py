@@ -8,53 +8,218 @@ import os
 import json
 import sqlite3
 import random
-from datetime import datetime
+import threading
+import time
+import atexit
+import logging
+import queue
 from functools import wraps
 from typing import Any, Dict, List, Optional
 from pathlib import Path
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask import (
     Flask, g, session, request, redirect, url_for,
-    render_template, flash, jsonify
+    render_template, stream_template, flash, jsonify
 )
+from flask.json.provider import DefaultJSONProvider
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used otherwise
+    orjson = None
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import Argon2Error
+except ImportError:  # fall back to werkzeug hashes
+    PasswordHasher = None
+    Argon2Error = Exception
+
 # --- Database Configuration ---
 APP_ROOT = Path(__file__).resolve().parent
 INSTANCE_DIR = APP_ROOT / "instance"
 INSTANCE_DIR.mkdir(exist_ok=True)
 DB_PATH = INSTANCE_DIR / "pla.db"
+DB_PATH_ABS = os.path.abspath(DB_PATH)  # resolved once for diagnostics
+HASH_CACHE_PATH = INSTANCE_DIR / ".hashes_cache.json"
+POOL_SIZE = 8
+# UPDATE ... RETURNING needs SQLite 3.35+
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+def _connect() -> sqlite3.Connection:
+    """Open a connection with the per-connection PRAGMAs applied once."""
+    # Autocommit: multi-statement writes open their own BEGIN IMMEDIATE.
+    # Pooled connections live for the whole process, so a larger statement
+    # cache keeps every route's SQL prepared across requests.
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False,
+                           isolation_level=None, cached_statements=256)
+    conn.row_factory = sqlite3.Row
+    # WAL needs shared memory; set SQLITE_WAL=0 on network filesystems
+    journal_mode = "WAL" if os.environ.get("SQLITE_WAL", "1") != "0" else "DELETE"
+    conn.executescript(f"""
+    PRAGMA journal_mode={journal_mode};
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-65536;
+    PRAGMA mmap_size=268435456;
+    PRAGMA foreign_keys=ON;
+    """)
+    return conn
+
+# Process-wide pool so requests reuse warm connections instead of reconnecting
+_POOL: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=POOL_SIZE)
+for _ in range(POOL_SIZE):
+    _POOL.put(_connect())
+
+@atexit.register
+def _drain_pool():
+    """Close pooled connections on shutdown."""
+    while True:
+        try:
+            _POOL.get_nowait().close()
+        except queue.Empty:
+            break
 
 def get_db():
-    """Get database connection with proper configuration."""
+    """Get a pooled database connection for this request."""
     if "db" not in g:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        g.db = conn
+        g.db = _POOL.get()
     return g.db
 
 # --- Configuration & Setup ---
-load_dotenv()
+if not os.environ.get("FLASK_ENV"):  # deployed environments are already populated
+    load_dotenv()
 app = Flask(__name__, static_folder="static", template_folder="templates")
 app.secret_key = os.environ.get("FLASK_SECRET", "dev-secret-plai")
-app.config["JSON_SORT_KEYS"] = False
+
+logger = logging.getLogger("plai")
+if not logger.handlers:
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+    logger.addHandler(_log_handler)
+# Debug records are dropped before formatting in production
+logger.setLevel(logging.INFO if os.environ.get("APP_MODE") == "prod" else logging.DEBUG)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson; keys keep insertion order."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+else:
+    app.json.sort_keys = False
 
 @app.teardown_appcontext
 def close_db(_=None):
-    """Close database connection."""
+    """Return the database connection to the pool."""
     db = g.pop("db", None)
     if db is not None:
-        db.close()
+        db.rollback()
+        _POOL.put(db)
+
+@app.before_request
+def load_session_ids():
+    """Copy the session's user/student ids onto g once per request."""
+    g.user_id = session.get("user_id")
+    g.student_id = session.get("student_id")
+
+# --- JSON Helpers ---
+def json_bytes(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+def json_loads(raw: Any) -> Any:
+    """Parse JSON text or bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+# --- Password Hashing ---
+# Argon2id runs in C and releases the GIL; werkzeug hashes are still
+# accepted so accounts created before the switch can log in.
+_PH = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1) if PasswordHasher else None
+
+def hash_password(password: str) -> str:
+    """Hash a password, preferring Argon2id when argon2-cffi is installed."""
+    if _PH is not None:
+        return _PH.hash(password)
+    from werkzeug.security import generate_password_hash
+    return generate_password_hash(password)
+
+def verify_password(pwhash: str, password: str) -> bool:
+    """Check a password against an Argon2 or legacy werkzeug hash."""
+    if pwhash.startswith("$argon2"):
+        if _PH is None:
+            return False
+        try:
+            return _PH.verify(pwhash, password)
+        except Argon2Error:
+            return False
+    from werkzeug.security import check_password_hash
+    return check_password_hash(pwhash, password)
+
+def password_needs_rehash(pwhash: str) -> bool:
+    """True when a stored hash should be upgraded to the current Argon2 settings."""
+    if _PH is None:
+        return False
+    if not pwhash.startswith("$argon2"):
+        return True
+    return _PH.check_needs_rehash(pwhash)
+
+def cached_password_hash(label: str, password: str) -> str:
+    """Hash a seed password, reusing the hash cached next to the DB under `label`.
+
+    The cache is keyed by a fixed account label, never by anything derived from
+    the password; delete HASH_CACHE_PATH after changing a seed password.
+    """
+    try:
+        cache = json_loads(HASH_CACHE_PATH.read_bytes())
+    except (OSError, ValueError):
+        cache = {}
+    pwhash = cache.get(label)
+    if not pwhash or password_needs_rehash(pwhash):
+        pwhash = hash_password(password)
+        cache[label] = pwhash
+        try:
+            HASH_CACHE_PATH.write_bytes(json_bytes(cache))
+        except OSError:
+            pass  # cache is best-effort; seeding still works without it
+    return pwhash
 
 # --- Self-Healing Database Initializer ---
-def ensure_schema_and_min_seed():
-    """Ensure database schema exists and seed with minimal demo data."""
-    db = sqlite3.connect(DB_PATH)
+OPTION_COLUMNS = ("option_a", "option_b", "option_c", "option_d")
+
+def parse_options(raw) -> Optional[List[str]]:
+    """Parse a legacy options_json value into four option strings, or None if invalid."""
+    try:
+        parsed = json_loads(raw)
+    except (ValueError, TypeError):  # both decoders raise ValueError subclasses
+        return None
+    if isinstance(parsed, list) and len(parsed) >= 4:
+        return [str(x) for x in parsed[:4]]
+    return None
+
+def ensure_schema_and_min_seed() -> tuple[int, int]:
+    """Ensure database schema exists, seed minimal demo data, return (students, questions)."""
+    # Autocommit mode: transactions below are opened explicitly with BEGIN
+    db = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
     db.row_factory = sqlite3.Row
     cur = db.cursor()
 
-    # Create clean schema (only the tables we use)
-    cur.executescript("""
+    # The correctness column is is_correct in schema.sql databases, score in the
+    # table created below; the covering indexes key on whichever exists
+    resp_cols = {row["name"] for row in cur.execute("PRAGMA table_info(response)")}
+    score_col = "is_correct" if "is_correct" in resp_cols else "score"
+
+    # Create clean schema (only the tables we use) and the hot-path indexes
+    cur.executescript(f"""
     PRAGMA foreign_keys=ON;
     CREATE TABLE IF NOT EXISTS student(
       student_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -82,7 +247,10 @@ def ensure_schema_and_min_seed():
       quiz_id INTEGER PRIMARY KEY AUTOINCREMENT,
       question TEXT NOT NULL,
       two_category TEXT NOT NULL,
-      options_json TEXT NOT NULL,
+      option_a TEXT NOT NULL,
+      option_b TEXT NOT NULL,
+      option_c TEXT NOT NULL,
+      option_d TEXT NOT NULL,
       correct_answer TEXT NOT NULL,
       explanation TEXT DEFAULT ''
     );
@@ -98,217 +266,322 @@ def ensure_schema_and_min_seed():
       FOREIGN KEY(attempt_id) REFERENCES attempt(attempt_id) ON DELETE CASCADE,
       FOREIGN KEY(quiz_id) REFERENCES quiz(quiz_id) ON DELETE CASCADE
     );
+    CREATE INDEX IF NOT EXISTS idx_attempt_student_finished ON attempt(student_id, finished_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_attempt_student_started ON attempt(student_id, started_at DESC);
+    -- Covering indexes for the review/dashboard tallies and the admin aggregates
+    CREATE INDEX IF NOT EXISTS idx_response_attempt_cover ON response(attempt_id, quiz_id, {score_col});
+    CREATE INDEX IF NOT EXISTS idx_response_quiz_cover ON response(quiz_id, {score_col}, response_time_s);
     """)
 
+    # Older databases keep options as a JSON array; split them into columns
+    quiz_cols = {row["name"] for row in cur.execute("PRAGMA table_info(quiz)")}
+    missing = [col for col in OPTION_COLUMNS if col not in quiz_cols]
+    if missing:
+        cur.execute("BEGIN IMMEDIATE")
+        for col in missing:
+            cur.execute(f"ALTER TABLE quiz ADD COLUMN {col} TEXT")
+        if "options_json" in quiz_cols:
+            rows = cur.execute("SELECT quiz_id, options_json FROM quiz").fetchall()
+            cur.executemany(
+                "UPDATE quiz SET option_a=?, option_b=?, option_c=?, option_d=? WHERE quiz_id=?",
+                [(*opts, row["quiz_id"]) for row in rows
+                 if (opts := parse_options(row["options_json"])) is not None]
+            )
+        cur.execute("COMMIT")
+
     # If no data or wrong counts, seed deterministic demo data
     total_q = cur.execute("SELECT COUNT(*) AS n FROM quiz").fetchone()["n"]
     total_s = cur.execute("SELECT COUNT(*) AS n FROM student").fetchone()["n"]
     if total_q != 30 or total_s < 2:
-        cur.execute("DELETE FROM response")
-        cur.execute("DELETE FROM attempt")
-        cur.execute("DELETE FROM quiz")
-        cur.execute("DELETE FROM student")
-        cur.execute("DELETE FROM lecturer")
-
-        # 2 students + 1 lecturer
-        cur.execute("INSERT INTO student(name,email,password_hash) VALUES(?,?,?)",
-                    ("NG EN JI","ngenji@demo.edu", generate_password_hash("Student123!")))
-        cur.execute("INSERT INTO student(name,email,password_hash) VALUES(?,?,?)",
-                    ("MUHAMMAD FARHAN","farhan@demo.edu", generate_password_hash("Student123!")))
-        cur.execute("INSERT INTO lecturer(name,email,password_hash) VALUES(?,?,?)",
-                    ("Admin","admin@lct.edu", generate_password_hash("Admin123!")))
-
-        # 30 questions from provided CSV data
-        questions = []
-        def add(cat, q, opts, correct_letter, exp=""):
-            questions.append((q, cat, json.dumps(opts), correct_letter, exp))
-
-        # --- Add 15 Fundamentals ---
-        add("Data Modeling & DBMS Fundamentals",
-            "Which statement best describes a primary key?",
-            ["Uniquely identifies each row and cannot be NULL","Allows duplicate values and NULLs","Identifies groups of rows but not a single row","Is only used in views"],
-            "A","Primary keys must uniquely identify rows and be NOT NULL.")
-        
-        add("Data Modeling & DBMS Fundamentals",
-            "What is a candidate key?",
-            ["Any attribute that stores numeric values","Any superkey with redundant attributes removed","A key chosen for indexing only","The foreign key of a table"],
-            "B","A candidate key is a minimal superkey (no redundant attributes).")
-        
-        add("Data Modeling & DBMS Fundamentals",
-            "What is a superkey?",
-            ["A set of attributes that uniquely identifies rows","An attribute with many NULLs","A key used only across tables","A non-unique composite index"],
-            "A","Any attribute set that uniquely identifies a tuple is a superkey.")
-        
-        add("Data Modeling & DBMS Fundamentals",
-            "What does a foreign key enforce?",
-            ["Table partitioning","Functional dependency","Referential integrity between tables","Transaction isolation"],
-            "C","Foreign keys enforce referential integrity with the referenced table.")
-        
-        add("Data Modeling & DBMS Fundamentals",
-            "Which example is ONE-to-MANY?",
-            ["Each order has exactly one customer; a customer has many orders","Each order has many customers","A product belongs to many categories and each category has many products","Each order has one product and each product has one order"],
-            "A","One customer → many orders is 1:M.")
-        
-        add("Data Modeling & DBMS Fundamentals",
-            "What is a composite key?",
-            ["A key automatically generated by the DBMS","A key composed of more than one attribute","Any unique index","A key that changes frequently"],
-            "B","Composite keys contain two or more attributes.")
-        
-        add("Data Modeling & DBMS Fundamentals",
-            "What is a surrogate key?",
-            ["A business-meaningful key","A randomly generated or sequence-based key without business meaning","A natural key used in reports","A foreign key with default value"],
-            "B","Surrogate keys are system-generated and free of business meaning.")
-        
-        add("Data Modeling & DBMS Fundamentals",
-            "In ER modeling, what is cardinality?",
-            ["The number of attributes in an entity","The number of rows in a table","The count of entity instances that can participate in a relationship","The number of foreign keys in a schema"],
-            "C","Cardinality describes participation counts in relationships.")
-        
-        add("Data Modeling & DBMS Fundamentals",
-            "A weak entity typically requires what?",
-            ["A multivalued attribute","An identifying relationship and a partial key","Only a surrogate key","No relationship to any other entity"],
-            "B","Weak entities depend on owners via an identifying relationship.")
-        
-        add("Data Modeling & DBMS Fundamentals",
-            "Schema vs. instance — which is true?",
-            ["A schema changes every transaction","An instance is the INTENT; a schema is the CONTENT","A schema is the structure; an instance is the current data","A schema is per row; instance is per column"],
-            "C","Schema = structure; instance = data at a point in time.")
-        
-        add("Data Modeling & DBMS Fundamentals",
-            "Which constraint type prevents duplicate non-NULL values?",
-            ["CHECK","DEFAULT","UNIQUE","FOREIGN KEY"],
-            "C","UNIQUE prevents duplicate non-NULL values.")
-        
-        add("Data Modeling & DBMS Fundamentals",
-            "How should a multivalued attribute be mapped to relations?",
-            ["Store as comma-separated values in one column","Create a separate relation to hold the values","Duplicate columns up to a fixed max","Merge into the parent key column"],
-            "B","Multivalued attributes are mapped to a separate relation.")
-        
-        add("Data Modeling & DBMS Fundamentals",
-            "Which best describes a tuple?",
-            ["A row in a relation","A column in a relation","A relationship between two tables","A file in the database"],
-            "A","Tuple is the relational model term for row.")
-        
-        add("Data Modeling & DBMS Fundamentals",
-            "What is the main purpose of indexing?",
-            ["Guarantee logical data independence","Speed up data retrieval at the cost of extra writes","Ensure BCNF","Prevent deadlocks"],
-            "B","Indexes accelerate reads with write/storage overhead.")
-        
-        add("Data Modeling & DBMS Fundamentals",
-            "Which is true of normalization at a high level?",
-            ["Ensures security roles","Eliminates concurrency issues","Reduces redundancy and anomalies","Forces star schemas"],
-            "C","Normalization reduces redundancy and anomalies by structuring data.")
-
-        # --- Add 15 Normalization ---
-        add("Normalization & Dependencies",
-            "Which best defines a functional dependency?",
-            ["Two tables joined on a key","One attribute (or set) uniquely determines another","Two rows referencing the same foreign key","Two attributes always having the same domain"],
-            "B","FD: X→Y means X determines Y.")
-        
-        add("Normalization & Dependencies",
-            "Which violates FD theory?",
-            ["Two rows share key but differ in non-key","Two rows differ only in key","Two rows have same non-key and same key","Rows are in different tables"],
-            "A","If key matches, all dependent attributes must match.")
-        
-        add("Normalization & Dependencies",
-            "What does 1NF require?",
-            ["No NULLs","Only numeric values","Atomic (indivisible) attribute values","All attributes must be keys"],
-            "C","1NF requires atomic values (no repeating groups).")
-        
-        add("Normalization & Dependencies",
-            "Partial dependency is when a non-key attribute depends on…",
-            ["The whole key only","A non-key attribute","Part of a composite key","Any superkey"],
-            "C","2NF removes partial dependencies on part of a composite key.")
-        
-        add("Normalization & Dependencies",
-            "2NF removes which anomaly source?",
-            ["Transitive dependency","Partial dependency","Multivalued dependency","Key substitution"],
-            "B","2NF addresses partial dependencies.")
-        
-        add("Normalization & Dependencies",
-            "Transitive dependency means…",
-            ["A→B and B→C implies A→C where C is non-prime","All attributes determine the key","Every FD has a superkey LHS","No determinants exist"],
-            "A","3NF eliminates transitive dependencies on keys.")
-        
-        add("Normalization & Dependencies",
-            "Which is allowed in 3NF?",
-            ["NonKey→Key","Key→NonKey","NonKey→NonKey","PartKey→NonKey"],
-            "B","3NF allows dependencies from keys to non-keys; forbids transitive from non-keys.")
-        
-        add("Normalization & Dependencies",
-            "BCNF requires…",
-            ["Every FD has a superkey on the left","Every FD has a candidate key on the right","No NULLs allowed","Only surrogate keys"],
-            "A","BCNF: for every X→Y, X must be a superkey.")
-        
-        add("Normalization & Dependencies",
-            "Main goal of normalization is to reduce…",
-            ["Joins in queries","Storage size only","Redundancy and anomalies","Number of tables"],
-            "C","Normalization reduces redundancy/anomalies, not just table count.")
-        
-        add("Normalization & Dependencies",
-            "Which property defines a lossless-join decomposition?",
-            ["Every projection is BCNF","Joining the decomposed tables never loses tuples","All FDs are preserved automatically","No NULLs in results"],
-            "B","Lossless join means no information loss after join.")
-        
-        add("Normalization & Dependencies",
-            "What is dependency preservation?",
-            ["All original FDs can be enforced without joining tables","All FDs are eliminated","All joins are avoided","All keys become surrogate keys"],
-            "A","Dependency preservation avoids enforcing FDs across joins.")
-        
-        add("Normalization & Dependencies",
-            "Closure of an attribute set X (X+ ) is…",
-            ["Set of attributes functionally determined by X","Minimal cover of FDs","The set of keys in the schema","The set of non-prime attributes"],
-            "A","Closure lists all attributes determined by X.")
-        
-        add("Normalization & Dependencies",
-            "To fix a 2NF issue you should…",
-            ["Create more indexes","Denormalize the table","Decompose to remove partial dependencies","Drop foreign keys"],
-            "C","Decompose to eliminate partial dependencies (reach 2NF).")
-        
-        add("Normalization & Dependencies",
-            "Which update anomaly is reduced by 3NF?",
-            ["Security escalation","Update anomalies on repeated facts","Deadlock anomalies","Lock escalation"],
-            "B","3NF reduces update anomalies by isolating facts.")
-        
-        add("Normalization & Dependencies",
-            "Given FD A,B→C and key (A,B), which is true?",
-            ["C partially depends on the key","C transitively depends on the key","C is unrelated to the key","C violates BCNF"],
-            "A","Non-key C depends on the whole composite key; not partial on a subset.")
-        
-        add("Normalization & Dependencies",
-            "When decomposing for BCNF, what's the usual trade-off?",
-            ["You may lose dependency preservation","You always lose lossless join","You must denormalize other tables","You must remove all keys"],
-            "A","BCNF may sacrifice dependency preservation while keeping lossless join when possible.")
-
-        cur.executemany(
-            "INSERT INTO quiz(question,two_category,options_json,correct_answer,explanation) VALUES (?,?,?,?,?)",
-            questions
-        )
+        cur.execute("BEGIN IMMEDIATE")  # single write transaction for the whole seed
+        try:
+            cur.execute("DELETE FROM response")
+            cur.execute("DELETE FROM attempt")
+            cur.execute("DELETE FROM quiz")
+            cur.execute("DELETE FROM student")
+            cur.execute("DELETE FROM lecturer")
+
+            # 2 students + 1 lecturer (one hash per distinct password)
+            student_pw_hash = cached_password_hash("student", "Student123!")
+            admin_pw_hash = cached_password_hash("admin", "Admin123!")
+            cur.execute("INSERT INTO student(name,email,password_hash) VALUES(?,?,?)",
+                        ("NG EN JI","ngenji@demo.edu", student_pw_hash))
+            cur.execute("INSERT INTO student(name,email,password_hash) VALUES(?,?,?)",
+                        ("MUHAMMAD FARHAN","farhan@demo.edu", student_pw_hash))
+            cur.execute("INSERT INTO lecturer(name,email,password_hash) VALUES(?,?,?)",
+                        ("Admin","admin@lct.edu", admin_pw_hash))
+
+            # 30 questions from provided CSV data
+            questions = []
+            def add(cat, q, opts, correct_letter, exp=""):
+                questions.append((q, cat, opts[0], opts[1], opts[2], opts[3], correct_letter, exp))
+
+            # --- Add 15 Fundamentals ---
+            add("Data Modeling & DBMS Fundamentals",
+                "Which statement best describes a primary key?",
+                ["Uniquely identifies each row and cannot be NULL","Allows duplicate values and NULLs","Identifies groups of rows but not a single row","Is only used in views"],
+                "A","Primary keys must uniquely identify rows and be NOT NULL.")
+        
+            add("Data Modeling & DBMS Fundamentals",
+                "What is a candidate key?",
+                ["Any attribute that stores numeric values","Any superkey with redundant attributes removed","A key chosen for indexing only","The foreign key of a table"],
+                "B","A candidate key is a minimal superkey (no redundant attributes).")
+        
+            add("Data Modeling & DBMS Fundamentals",
+                "What is a superkey?",
+                ["A set of attributes that uniquely identifies rows","An attribute with many NULLs","A key used only across tables","A non-unique composite index"],
+                "A","Any attribute set that uniquely identifies a tuple is a superkey.")
+        
+            add("Data Modeling & DBMS Fundamentals",
+                "What does a foreign key enforce?",
+                ["Table partitioning","Functional dependency","Referential integrity between tables","Transaction isolation"],
+                "C","Foreign keys enforce referential integrity with the referenced table.")
+        
+            add("Data Modeling & DBMS Fundamentals",
+                "Which example is ONE-to-MANY?",
+                ["Each order has exactly one customer; a customer has many orders","Each order has many customers","A product belongs to many categories and each category has many products","Each order has one product and each product has one order"],
+                "A","One customer → many orders is 1:M.")
+        
+            add("Data Modeling & DBMS Fundamentals",
+                "What is a composite key?",
+                ["A key automatically generated by the DBMS","A key composed of more than one attribute","Any unique index","A key that changes frequently"],
+                "B","Composite keys contain two or more attributes.")
+        
+            add("Data Modeling & DBMS Fundamentals",
+                "What is a surrogate key?",
+                ["A business-meaningful key","A randomly generated or sequence-based key without business meaning","A natural key used in reports","A foreign key with default value"],
+                "B","Surrogate keys are system-generated and free of business meaning.")
+        
+            add("Data Modeling & DBMS Fundamentals",
+                "In ER modeling, what is cardinality?",
+                ["The number of attributes in an entity","The number of rows in a table","The count of entity instances that can participate in a relationship","The number of foreign keys in a schema"],
+                "C","Cardinality describes participation counts in relationships.")
+        
+            add("Data Modeling & DBMS Fundamentals",
+                "A weak entity typically requires what?",
+                ["A multivalued attribute","An identifying relationship and a partial key","Only a surrogate key","No relationship to any other entity"],
+                "B","Weak entities depend on owners via an identifying relationship.")
+        
+            add("Data Modeling & DBMS Fundamentals",
+                "Schema vs. instance — which is true?",
+                ["A schema changes every transaction","An instance is the INTENT; a schema is the CONTENT","A schema is the structure; an instance is the current data","A schema is per row; instance is per column"],
+                "C","Schema = structure; instance = data at a point in time.")
+        
+            add("Data Modeling & DBMS Fundamentals",
+                "Which constraint type prevents duplicate non-NULL values?",
+                ["CHECK","DEFAULT","UNIQUE","FOREIGN KEY"],
+                "C","UNIQUE prevents duplicate non-NULL values.")
+        
+            add("Data Modeling & DBMS Fundamentals",
+                "How should a multivalued attribute be mapped to relations?",
+                ["Store as comma-separated values in one column","Create a separate relation to hold the values","Duplicate columns up to a fixed max","Merge into the parent key column"],
+                "B","Multivalued attributes are mapped to a separate relation.")
+        
+            add("Data Modeling & DBMS Fundamentals",
+                "Which best describes a tuple?",
+                ["A row in a relation","A column in a relation","A relationship between two tables","A file in the database"],
+                "A","Tuple is the relational model term for row.")
+        
+            add("Data Modeling & DBMS Fundamentals",
+                "What is the main purpose of indexing?",
+                ["Guarantee logical data independence","Speed up data retrieval at the cost of extra writes","Ensure BCNF","Prevent deadlocks"],
+                "B","Indexes accelerate reads with write/storage overhead.")
+        
+            add("Data Modeling & DBMS Fundamentals",
+                "Which is true of normalization at a high level?",
+                ["Ensures security roles","Eliminates concurrency issues","Reduces redundancy and anomalies","Forces star schemas"],
+                "C","Normalization reduces redundancy and anomalies by structuring data.")
+
+            # --- Add 15 Normalization ---
+            add("Normalization & Dependencies",
+                "Which best defines a functional dependency?",
+                ["Two tables joined on a key","One attribute (or set) uniquely determines another","Two rows referencing the same foreign key","Two attributes always having the same domain"],
+                "B","FD: X→Y means X determines Y.")
+        
+            add("Normalization & Dependencies",
+                "Which violates FD theory?",
+                ["Two rows share key but differ in non-key","Two rows differ only in key","Two rows have same non-key and same key","Rows are in different tables"],
+                "A","If key matches, all dependent attributes must match.")
+        
+            add("Normalization & Dependencies",
+                "What does 1NF require?",
+                ["No NULLs","Only numeric values","Atomic (indivisible) attribute values","All attributes must be keys"],
+                "C","1NF requires atomic values (no repeating groups).")
+        
+            add("Normalization & Dependencies",
+                "Partial dependency is when a non-key attribute depends on…",
+                ["The whole key only","A non-key attribute","Part of a composite key","Any superkey"],
+                "C","2NF removes partial dependencies on part of a composite key.")
+        
+            add("Normalization & Dependencies",
+                "2NF removes which anomaly source?",
+                ["Transitive dependency","Partial dependency","Multivalued dependency","Key substitution"],
+                "B","2NF addresses partial dependencies.")
+        
+            add("Normalization & Dependencies",
+                "Transitive dependency means…",
+                ["A→B and B→C implies A→C where C is non-prime","All attributes determine the key","Every FD has a superkey LHS","No determinants exist"],
+                "A","3NF eliminates transitive dependencies on keys.")
+        
+            add("Normalization & Dependencies",
+                "Which is allowed in 3NF?",
+                ["NonKey→Key","Key→NonKey","NonKey→NonKey","PartKey→NonKey"],
+                "B","3NF allows dependencies from keys to non-keys; forbids transitive from non-keys.")
+        
+            add("Normalization & Dependencies",
+                "BCNF requires…",
+                ["Every FD has a superkey on the left","Every FD has a candidate key on the right","No NULLs allowed","Only surrogate keys"],
+                "A","BCNF: for every X→Y, X must be a superkey.")
+        
+            add("Normalization & Dependencies",
+                "Main goal of normalization is to reduce…",
+                ["Joins in queries","Storage size only","Redundancy and anomalies","Number of tables"],
+                "C","Normalization reduces redundancy/anomalies, not just table count.")
+        
+            add("Normalization & Dependencies",
+                "Which property defines a lossless-join decomposition?",
+                ["Every projection is BCNF","Joining the decomposed tables never loses tuples","All FDs are preserved automatically","No NULLs in results"],
+                "B","Lossless join means no information loss after join.")
+        
+            add("Normalization & Dependencies",
+                "What is dependency preservation?",
+                ["All original FDs can be enforced without joining tables","All FDs are eliminated","All joins are avoided","All keys become surrogate keys"],
+                "A","Dependency preservation avoids enforcing FDs across joins.")
+        
+            add("Normalization & Dependencies",
+                "Closure of an attribute set X (X+ ) is…",
+                ["Set of attributes functionally determined by X","Minimal cover of FDs","The set of keys in the schema","The set of non-prime attributes"],
+                "A","Closure lists all attributes determined by X.")
+        
+            add("Normalization & Dependencies",
+                "To fix a 2NF issue you should…",
+                ["Create more indexes","Denormalize the table","Decompose to remove partial dependencies","Drop foreign keys"],
+                "C","Decompose to eliminate partial dependencies (reach 2NF).")
+        
+            add("Normalization & Dependencies",
+                "Which update anomaly is reduced by 3NF?",
+                ["Security escalation","Update anomalies on repeated facts","Deadlock anomalies","Lock escalation"],
+                "B","3NF reduces update anomalies by isolating facts.")
+        
+            add("Normalization & Dependencies",
+                "Given FD A,B→C and key (A,B), which is true?",
+                ["C partially depends on the key","C transitively depends on the key","C is unrelated to the key","C violates BCNF"],
+                "A","Non-key C depends on the whole composite key; not partial on a subset.")
+        
+            add("Normalization & Dependencies",
+                "When decomposing for BCNF, what's the usual trade-off?",
+                ["You may lose dependency preservation","You always lose lossless join","You must denormalize other tables","You must remove all keys"],
+                "A","BCNF may sacrifice dependency preservation while keeping lossless join when possible.")
+
+            cur.executemany(
+                "INSERT INTO quiz(question,two_category,option_a,option_b,option_c,option_d,correct_answer,explanation) VALUES (?,?,?,?,?,?,?,?)",
+                questions
+            )
+
+            # Create one perfect attempt for NG EN JI (unlocks next topic)
+            ngenji_id = cur.execute("SELECT student_id FROM student WHERE email=?",
+                                    ("ngenji@demo.edu",)).fetchone()["student_id"]
+            cur.execute("INSERT INTO attempt(student_id,started_at,finished_at,score_pct,items_total,items_correct) VALUES (?,?,?,?,?,?)",
+                        (ngenji_id, "2025-10-19T09:00:00", "2025-10-19T09:15:00", 100.0, 30, 30))
+            attempt_id = cur.lastrowid
+            # Save all correct in one statement
+            cur.execute("INSERT INTO response(student_id,attempt_id,quiz_id,answer,score,response_time_s) "
+                        "SELECT ?,?,quiz_id,correct_answer,1,10.0 FROM quiz",
+                        (ngenji_id, attempt_id))
+            cur.execute("COMMIT")
+            cur.execute("ANALYZE")  # refresh planner stats after the bulk load
+        except Exception:
+            cur.execute("ROLLBACK")
+            raise
+        total_s = cur.execute("SELECT COUNT(*) AS n FROM student").fetchone()["n"]
+        total_q = cur.execute("SELECT COUNT(*) AS n FROM quiz").fetchone()["n"]
 
-        # Create one perfect attempt for NG EN JI (unlocks next topic)
-        ngenji_id = cur.execute("SELECT student_id FROM student WHERE email=?",
-                                ("ngenji@demo.edu",)).fetchone()["student_id"]
-        cur.execute("INSERT INTO attempt(student_id,started_at,finished_at,score_pct,items_total,items_correct) VALUES (?,?,?,?,?,?)",
-                    (ngenji_id, "2025-10-19T09:00:00", "2025-10-19T09:15:00", 100.0, 30, 30))
-        attempt_id = cur.lastrowid
-        quiz_ids = [row["quiz_id"] for row in cur.execute("SELECT quiz_id, correct_answer FROM quiz").fetchall()]
-        for qid in quiz_ids:
-            # save all correct
-            correct = cur.execute("SELECT correct_answer FROM quiz WHERE quiz_id=?", (qid,)).fetchone()["correct_answer"]
-            cur.execute("INSERT INTO response(student_id,attempt_id,quiz_id,answer,score,response_time_s) VALUES (?,?,?,?,?,?)",
-                        (ngenji_id, attempt_id, qid, correct, 1, 10.0))
-
-        db.commit()
     db.close()
+    return total_s, total_q
 
 # Initialize database on startup
-ensure_schema_and_min_seed()
+student_count, quiz_count = ensure_schema_and_min_seed()
 
 # Startup logging
-print(f"[BOOT] Database: {DB_PATH}")
-student_count = sqlite3.connect(DB_PATH).execute("SELECT COUNT(*) FROM student").fetchone()[0]
-quiz_count = sqlite3.connect(DB_PATH).execute("SELECT COUNT(*) FROM quiz").fetchone()[0]
-print(f"[BOOT] Students: {student_count}, Questions: {quiz_count}")
+logger.info("BOOT database=%s", DB_PATH)
+logger.info("BOOT students=%s questions=%s", student_count, quiz_count)
+
+# --- Quiz Payload Cache ---
+# Normalized questions are built once per process and pre-serialized. The bank
+# version lives in the database header (PRAGMA user_version), so
+# invalidate_quiz_cache() reaches every worker process, not only the caller.
+_QUIZ_CACHE_JSON: List[bytes] = []
+_quiz_cache_built_version = -1
+_ANSWER_KEY: Dict[int, str] = {}
+_answer_key_built_version = -1
+
+def normalize_question(r) -> dict | None:
+    """Normalize a question row to required format or return None if invalid."""
+    if r["option_a"] is None:
+        logger.warning("Missing options for quiz_id %s", r["quiz_id"])
+        return None
+    
+    # The quiz table stores the answer letter (A-D) in correct_answer
+    correct_letter = r.get("correct_answer", "A")
+    
+    return {
+        "quiz_id": r["quiz_id"],
+        "two_category": r["two_category"],
+        "question": r["question"],
+        "option_a": r["option_a"],
+        "option_b": r["option_b"],
+        "option_c": r["option_c"],
+        "option_d": r["option_d"],
+        "correct_letter": correct_letter,
+        "explanation": r.get("explanation", "")
+    }
+
+def quiz_bank_version() -> int:
+    """Return the shared quiz bank version (a header read, no table access)."""
+    return get_db().execute("PRAGMA user_version").fetchone()[0]
+
+def invalidate_quiz_cache() -> int:
+    """Bump the shared quiz bank version so every worker rebuilds on next use."""
+    version = quiz_bank_version() + 1
+    get_db().execute(f"PRAGMA user_version = {version:d}")
+    return version
+
+def get_quiz_cache() -> List[bytes]:
+    """Return the pre-serialized quiz items, building them if stale."""
+    global _QUIZ_CACHE_JSON, _quiz_cache_built_version
+    version = quiz_bank_version()
+    if _quiz_cache_built_version != version:
+        rows = get_db().execute("""
+            SELECT quiz_id, question, two_category,
+                   option_a, option_b, option_c, option_d, correct_answer, explanation
+            FROM quiz
+        """).fetchall()
+
+        structured = []
+        skipped = 0
+        for r in rows:
+            normalized = normalize_question(dict(r))
+            if normalized:
+                structured.append(normalized)
+            else:
+                skipped += 1
+        logger.debug("Cached %d questions (skipped %d)", len(structured), skipped)
+
+        _QUIZ_CACHE_JSON = [json_bytes(q) for q in structured]
+        _quiz_cache_built_version = version
+    return _QUIZ_CACHE_JSON
+
+def get_answer_key() -> Dict[int, str]:
+    """Return the quiz_id -> correct_answer letter map used for grading, rebuilding if stale."""
+    global _ANSWER_KEY, _answer_key_built_version
+    version = quiz_bank_version()
+    if _answer_key_built_version != version:
+        _ANSWER_KEY = {
+            r["quiz_id"]: r["correct_answer"]
+            for r in get_db().execute("SELECT quiz_id, correct_answer FROM quiz")
+        }
+        _answer_key_built_version = version
+    return _ANSWER_KEY
 
 # --- Debug Helper Route ---
 @app.get("/_doctor/dbpath")
@@ -372,52 +645,48 @@ def login():
         
         conn = get_db()
         
-        # Check student first (as per requirements)
-        student = conn.execute(
-            "SELECT student_id, name, password_hash FROM student WHERE email = ?",
-            (email,)
-        ).fetchone()
-        
-        if student:
-            if check_password_hash(student['password_hash'], password):
-                session['user_id'] = student['student_id']
-                session['role'] = 'student'
-                session['name'] = student['name']
-                session['student_id'] = student['student_id']
-                
-                # Check if student has a latest finished attempt
-                conn = get_db()
-                latest_attempt = conn.execute("""
-                    SELECT attempt_id FROM attempt 
-                    WHERE student_id = ? AND finished_at IS NOT NULL 
-                    ORDER BY finished_at DESC LIMIT 1
-                """, (student['student_id'],)).fetchone()
-                
-                if latest_attempt:
-                    return redirect(url_for('review', attempt_id=latest_attempt['attempt_id']))
-                else:
-                    return redirect(url_for('quiz'))
-            else:
-                print(f"[AUTH] Password mismatch for {email} (role=student)")
-        else:
-            print(f"[AUTH] Email not found (student)")
+        # One lookup across both roles; students are checked first (as per requirements)
+        accounts = conn.execute("""
+            SELECT 'student' AS role, student_id AS id, name, password_hash FROM student WHERE email = ?
+            UNION ALL
+            SELECT 'lecturer' AS role, lecturer_id AS id, name, password_hash FROM lecturer WHERE email = ?
+        """, (email, email)).fetchall()
         
-        # Check lecturer
-        lecturer = conn.execute(
-            "SELECT lecturer_id, name, password_hash FROM lecturer WHERE email = ?",
-            (email,)
-        ).fetchone()
+        if not accounts:
+            logger.info("AUTH email not found")
         
-        if lecturer:
-            if check_password_hash(lecturer['password_hash'], password):
-                session['user_id'] = lecturer['lecturer_id']
-                session['role'] = 'lecturer'
-                session['name'] = lecturer['name']
+        for account in accounts:
+            role = account['role']
+            if not verify_password(account['password_hash'], password):
+                logger.info("AUTH password mismatch for %s (role=%s)", email, role)
+                continue
+            
+            if password_needs_rehash(account['password_hash']):
+                conn.execute(
+                    f"UPDATE {role} SET password_hash = ? WHERE {role}_id = ?",
+                    (hash_password(password), account['id'])
+                )
+                conn.commit()
+            
+            session['user_id'] = account['id']
+            session['role'] = role
+            session['name'] = account['name']
+            if role == 'lecturer':
                 return redirect(url_for('admin'))
+            
+            session['student_id'] = account['id']
+            
+            # Check if student has a latest finished attempt
+            latest_attempt = conn.execute("""
+                SELECT attempt_id FROM attempt 
+                WHERE student_id = ? AND finished_at IS NOT NULL 
+                ORDER BY finished_at DESC LIMIT 1
+            """, (account['id'],)).fetchone()
+            
+            if latest_attempt:
+                return redirect(url_for('review', attempt_id=latest_attempt['attempt_id']))
             else:
-                print(f"[AUTH] Password mismatch for {email} (role=lecturer)")
-        else:
-            print(f"[AUTH] Email not found (lecturer)")
+                return redirect(url_for('quiz'))
         
         flash('Invalid email or password', 'error')
     
@@ -452,7 +721,7 @@ def register():
             return render_template('register.html')
         
         # Create student
-        password_hash = generate_password_hash(password)
+        password_hash = hash_password(password)
         conn.execute(
             "INSERT INTO student (name, email, password_hash, program) VALUES (?, ?, ?, ?)",
             (name, email, password_hash, 'BIT')
@@ -475,17 +744,18 @@ def logout():
 @student_required
 def student_dashboard(student_id):
     """Student dashboard with latest attempt metrics."""
-    if session['user_id'] != student_id:
+    if g.user_id != student_id:
         return redirect(url_for('login'))
     
-    conn = get_db()
+    execute = get_db().execute
     
-    # Get latest finished attempt
-    latest_attempt = conn.execute("""
+    # Last 10 finished attempts feed the chart; the first one is the latest
+    attempts = execute("""
         SELECT * FROM attempt 
         WHERE student_id = ? AND finished_at IS NOT NULL 
-        ORDER BY finished_at DESC LIMIT 1
-    """, (student_id,)).fetchone()
+        ORDER BY finished_at DESC LIMIT 10
+    """, (student_id,)).fetchall()
+    latest_attempt = attempts[0] if attempts else None
     
     if not latest_attempt:
         return render_template('student_dashboard.html', 
@@ -501,31 +771,24 @@ def student_dashboard(student_id):
                              scores=[])
     
     # Calculate topic percentages for latest attempt
-    responses = conn.execute("""
-        SELECT r.is_correct, q.two_category
+    by_cat = {row['two_category']: (row['c'], row['t']) for row in execute("""
+        SELECT q.two_category, SUM(r.is_correct) AS c, COUNT(*) AS t
         FROM response r
         JOIN quiz q ON r.quiz_id = q.quiz_id
         WHERE r.attempt_id = ?
-    """, (latest_attempt['attempt_id'],)).fetchall()
+        GROUP BY q.two_category
+    """, (latest_attempt['attempt_id'],))}
     
-    fund_correct = sum(1 for r in responses if r['is_correct'] and r['two_category'] == 'Data Modeling & DBMS Fundamentals')
-    fund_total = sum(1 for r in responses if r['two_category'] == 'Data Modeling & DBMS Fundamentals')
-    norm_correct = sum(1 for r in responses if r['is_correct'] and r['two_category'] == 'Normalization & Dependencies')
-    norm_total = sum(1 for r in responses if r['two_category'] == 'Normalization & Dependencies')
+    fund_correct, fund_total = by_cat.get('Data Modeling & DBMS Fundamentals', (0, 0))
+    norm_correct, norm_total = by_cat.get('Normalization & Dependencies', (0, 0))
+    
+    # Check if unlocked (both topics 100%); compare counts, not rounded percentages
+    unlocked = (fund_total > 0 and norm_total > 0
+                and fund_correct == fund_total and norm_correct == norm_total)
     
     fund_pct = round((fund_correct / fund_total * 100), 1) if fund_total > 0 else 0
     norm_pct = round((norm_correct / norm_total * 100), 1) if norm_total > 0 else 0
     
-    # Check if unlocked (both topics 100%)
-    unlocked = fund_pct == 100.0 and norm_pct == 100.0
-    
-    # Get all finished attempts for chart
-    attempts = conn.execute("""
-        SELECT * FROM attempt 
-        WHERE student_id = ? AND finished_at IS NOT NULL 
-        ORDER BY finished_at DESC LIMIT 10
-    """, (student_id,)).fetchall()
-    
     # Prepare chart data
     labels = [f"Attempt {i+1}" for i in range(len(attempts))]
     scores = [float(attempt['score_pct']) for attempt in attempts]
@@ -553,7 +816,7 @@ def quiz():
         SELECT attempt_id FROM attempt 
         WHERE student_id = ? AND finished_at IS NULL 
         ORDER BY started_at DESC LIMIT 1
-    """, (session['user_id'],)).fetchone()
+    """, (g.user_id,)).fetchone()
     
     if existing_attempt:
         flash('You have an existing quiz in progress. Continuing...', 'info')
@@ -563,7 +826,7 @@ def quiz():
     cursor = conn.execute("""
         INSERT INTO attempt (student_id, started_at, source) 
         VALUES (?, datetime('now'), 'web')
-    """, (session['user_id'],))
+    """, (g.user_id,))
     
     attempt_id = cursor.lastrowid
     conn.commit()
@@ -573,95 +836,37 @@ def quiz():
 @app.route("/api/quiz_progressive")
 @student_required
 def api_quiz_progressive() -> Any:
-    """Get 30 questions in random order with robust option parsing."""
+    """Get 30 questions in random order from the cached quiz payload."""
     try:
         # Ensure we have an active attempt
         atid = session.get("current_attempt_id")
         if not atid:
             conn = get_db()
-            conn.execute(
-                "INSERT INTO attempt (student_id, started_at) VALUES (?, ?)",
-                (session["student_id"], datetime.now().isoformat())
+            cur = conn.execute(
+                "INSERT INTO attempt (student_id, started_at) VALUES (?, datetime('now'))",
+                (g.student_id,)
             )
             conn.commit()
-            row = conn.execute(
-                "SELECT attempt_id FROM attempt WHERE student_id=? ORDER BY started_at DESC LIMIT 1",
-                (session["student_id"],)
-            ).fetchone()
-            atid = row["attempt_id"]
+            atid = cur.lastrowid
             session["current_attempt_id"] = atid
 
-        conn = get_db()
-        rows = conn.execute("""
-            SELECT quiz_id, question, two_category, options_json, correct_letter, explanation
-            FROM quiz
-            ORDER BY RANDOM()
-            LIMIT 60
-        """).fetchall()
-
-        # Debug: Print total quiz count
-        total_quiz_count = conn.execute("SELECT COUNT(*) FROM quiz").fetchone()[0]
-        print(f"[DEBUG] Total quiz count: {total_quiz_count}")
-
-        def normalize_question(r) -> dict | None:
-            """Normalize a question row to required format or return None if invalid."""
-            # Parse options_json
-            opts = []
-            try:
-                parsed = json.loads(r["options_json"])
-                if isinstance(parsed, list) and len(parsed) >= 4:
-                    opts = [str(x) for x in parsed[:4]]
-                else:
-                    print(f"[WARNING] Invalid options_json for quiz_id {r['quiz_id']}: {r['options_json']}")
-                    return None
-            except (json.JSONDecodeError, TypeError) as e:
-                print(f"[WARNING] Failed to parse options_json for quiz_id {r['quiz_id']}: {e}")
-                return None
-            
-            # Get correct_letter (already validated by DB constraint)
-            correct_letter = r.get("correct_letter", "A")
-            
-            # Debug logging for first 3 rows
-            if len([q for q in [r] if q]) <= 3:  # Simple way to track first few
-                print(f"[DEBUG] Quiz {r['quiz_id']}: correct_letter={correct_letter}")
-            
-            return {
-                "quiz_id": r["quiz_id"],
-                "two_category": r["two_category"],
-                "question": r["question"],
-                "option_a": opts[0],
-                "option_b": opts[1],
-                "option_c": opts[2],
-                "option_d": opts[3],
-                "correct_letter": correct_letter,
-                "explanation": r.get("explanation", "")
-            }
-
-        structured = []
-        skipped = 0
-        
-        for r in rows:
-            normalized = normalize_question(dict(r))
-            if normalized:
-                structured.append(normalized)
-                if len(structured) == 30:
-                    break
-            else:
-                skipped += 1
-
-        if len(structured) == 0:
-            print(f"[ERROR] No questions could be normalized (skipped {skipped})")
+        payloads = get_quiz_cache()
+        if not payloads:
+            logger.error("No questions could be normalized")
             return jsonify({"error": "no_questions"}), 500
 
-        print(f"[DEBUG] Returning {len(structured)} questions (skipped {skipped})")
-        return jsonify(structured), 200
+        # Only the order changes per request; the item bytes are reused as-is
+        idx = list(range(len(payloads)))
+        random.shuffle(idx)
+        body = b"[" + b",".join(payloads[i] for i in idx[:30]) + b"]"
+        return app.response_class(body, mimetype="application/json"), 200
         
     except Exception as e:
-        print(f"[ERROR] QUIZ_LOAD_FAILURE: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("QUIZ_LOAD_FAILURE: %s", e)
         return jsonify({"error": "quiz_build_failed"}), 500
 
+RESPONSE_INSERT_CHUNK = 900 // 6  # rows per INSERT; 6 bound params per row
+
 @app.route('/submit', methods=['POST'])
 @student_required
 def submit_quiz():
@@ -674,63 +879,84 @@ def submit_quiz():
         if not attempt_id or not answers:
             return jsonify({'error': 'Missing attempt_id or answers'}), 400
         
+        # Parse the payload once into (quiz_id, answer, response_time) tuples
+        if not isinstance(answers, list) or not all(
+                isinstance(a, dict) and a.get('quiz_id') is not None for a in answers):
+            return jsonify({'error': 'Malformed answers'}), 400
+        parsed = [(a['quiz_id'], a.get('answer', 'A'), a.get('response_time', 0)) for a in answers]
+        
         conn = get_db()
         
         # Verify attempt belongs to current user
         attempt = conn.execute("""
             SELECT * FROM attempt WHERE attempt_id = ? AND student_id = ?
-        """, (attempt_id, session['student_id'])).fetchone()
+        """, (attempt_id, g.student_id)).fetchone()
         
         if not attempt:
             return jsonify({'error': 'Invalid attempt'}), 400
         
-        def get_correct_letter_for_quiz(quiz_id):
-            """Get the correct letter for a quiz (already stored as A/B/C/D)."""
-            quiz_row = conn.execute("""
-                SELECT correct_letter FROM quiz WHERE quiz_id = ?
-            """, (quiz_id,)).fetchone()
-            
-            if not quiz_row:
-                return "A"
-            
-            # correct_letter is already validated by DB constraint
-            return quiz_row.get("correct_letter", "A")
+        answer_key = get_answer_key()
+        # Quizzes added since the key was built are fetched in one IN query
+        missing = list({quiz_id for quiz_id, _, _ in parsed} - answer_key.keys())
+        if missing:
+            placeholders = ",".join("?" * len(missing))
+            answer_key = dict(answer_key)
+            answer_key.update(
+                (r["quiz_id"], r["correct_answer"]) for r in conn.execute(
+                    f"SELECT quiz_id, correct_answer FROM quiz WHERE quiz_id IN ({placeholders})",
+                    missing)
+            )
         
-        # Process each answer
+        # Grade each answer; rows are inserted in one batch below
         correct_count = 0
         total_count = len(answers)
+        student_id = g.student_id
+        rows = []
         
-        for answer in answers:
-            quiz_id = answer.get('quiz_id')
-            user_answer = answer.get('answer', 'A')  # User's selected letter
-            response_time = answer.get('response_time', 0)
-            
-            # Get correct letter using same logic as quiz API
-            correct_letter = get_correct_letter_for_quiz(quiz_id)
+        for quiz_id, user_answer, response_time in parsed:
+            # Grade against the in-memory answer key (no per-answer query)
+            correct_letter = answer_key.get(quiz_id, "A")
             
-            # Check if correct (strict letter comparison)
-            is_correct = 1 if user_answer == correct_letter else 0
-            if is_correct:
-                correct_count += 1
+            # Strict letter comparison; bool -> int keeps the tally branch-free
+            is_correct = int(user_answer == correct_letter)
+            correct_count += is_correct
             
-            # Store response
-            conn.execute("""
-                INSERT INTO response (student_id, attempt_id, quiz_id, answer, score, response_time_s)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (session['student_id'], attempt_id, quiz_id, user_answer, is_correct, response_time))
+            rows.append((student_id, attempt_id, quiz_id, user_answer, is_correct, response_time))
         
-        # Update attempt
         score_pct = round((correct_count / total_count * 100), 1) if total_count > 0 else 0
-        conn.execute("""
-            UPDATE attempt 
-            SET finished_at = datetime('now'), items_total = ?, items_correct = ?, score_pct = ?
-            WHERE attempt_id = ?
-        """, (total_count, correct_count, score_pct, attempt_id))
         
-        conn.commit()
+        # Store responses and close the attempt in a single transaction;
+        # IMMEDIATE takes the write lock up front instead of upgrading mid-way
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # One multi-row VALUES statement per chunk, kept under SQLite's
+            # historical 999 host-parameter limit
+            for start in range(0, len(rows), RESPONSE_INSERT_CHUNK):
+                chunk = rows[start:start + RESPONSE_INSERT_CHUNK]
+                placeholders = ",".join(["(?, ?, ?, ?, ?, ?)"] * len(chunk))
+                conn.execute(f"""
+                    INSERT INTO response (student_id, attempt_id, quiz_id, answer, score, response_time_s)
+                    VALUES {placeholders}
+                """, [v for row in chunk for v in row])
+            update_sql = """
+                UPDATE attempt 
+                SET finished_at = datetime('now'), items_total = ?, items_correct = ?, score_pct = ?
+                WHERE attempt_id = ?
+            """
+            update_args = (total_count, correct_count, score_pct, attempt_id)
+            if SQLITE_HAS_RETURNING:
+                # Read back the stored score in the same statement
+                score_pct = float(conn.execute(update_sql + " RETURNING score_pct", update_args).fetchone()["score_pct"])
+            else:
+                conn.execute(update_sql, update_args)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
         
         # Log submission
-        print(f"[DEBUG] QUIZ_SUBMIT: attempt_id={attempt_id}, total={total_count}, correct={correct_count}, score={score_pct:.1f}%")
+        logger.debug("QUIZ_SUBMIT attempt=%s total=%s correct=%s score=%.1f",
+                     attempt_id, total_count, correct_count, score_pct)
         
         return jsonify({
             'ok': True,
@@ -740,9 +966,7 @@ def submit_quiz():
         })
         
     except Exception as e:
-        print(f"[ERROR] SUBMIT_FAILURE: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("SUBMIT_FAILURE: %s", e)
         return jsonify({"error": "submit_failed"}), 500
 
 @app.route('/review/<int:attempt_id>')
@@ -754,36 +978,51 @@ def review(attempt_id):
     # Get attempt
     attempt = conn.execute("""
         SELECT * FROM attempt WHERE attempt_id = ? AND student_id = ?
-    """, (attempt_id, session['user_id'])).fetchone()
+    """, (attempt_id, g.user_id)).fetchone()
     
     if not attempt:
         flash('Attempt not found', 'error')
-        return redirect(url_for('student_dashboard', student_id=session['user_id']))
+        return redirect(url_for('student_dashboard', student_id=g.user_id))
     
-    # Get responses with quiz details
-    responses = conn.execute("""
+    # Executed before streaming starts so SQL errors still reach the 500
+    # handler; rows are then pulled a chunk at a time while rendering
+    responses_cur = conn.execute("""
         SELECT r.*, q.question, q.correct_text, q.two_category, q.explanation
         FROM response r
         JOIN quiz q ON r.quiz_id = q.quiz_id
         WHERE r.attempt_id = ?
         ORDER BY r.quiz_id
-    """, (attempt_id,)).fetchall()
+    """, (attempt_id,))
+
+    def iter_responses(chunk_size: int = 100):
+        """Yield responses with quiz details a chunk at a time while rendering."""
+        while rows := responses_cur.fetchmany(chunk_size):
+            yield from rows
     
     # Calculate topic percentages
-    fund_correct = sum(1 for r in responses if r['is_correct'] and r['two_category'] == 'Data Modeling & DBMS Fundamentals')
-    fund_total = sum(1 for r in responses if r['two_category'] == 'Data Modeling & DBMS Fundamentals')
-    norm_correct = sum(1 for r in responses if r['is_correct'] and r['two_category'] == 'Normalization & Dependencies')
-    norm_total = sum(1 for r in responses if r['two_category'] == 'Normalization & Dependencies')
+    by_cat = {row['two_category']: (row['c'], row['t']) for row in conn.execute("""
+        SELECT q.two_category, SUM(r.is_correct) AS c, COUNT(*) AS t
+        FROM response r
+        JOIN quiz q ON r.quiz_id = q.quiz_id
+        WHERE r.attempt_id = ?
+        GROUP BY q.two_category
+    """, (attempt_id,))}
+    
+    fund_correct, fund_total = by_cat.get('Data Modeling & DBMS Fundamentals', (0, 0))
+    norm_correct, norm_total = by_cat.get('Normalization & Dependencies', (0, 0))
+    
+    # Check if unlocked; compare counts, not rounded percentages
+    unlocked = (fund_total > 0 and norm_total > 0
+                and fund_correct == fund_total and norm_correct == norm_total)
     
     fund_pct = round((fund_correct / fund_total * 100), 1) if fund_total > 0 else 0
     norm_pct = round((norm_correct / norm_total * 100), 1) if norm_total > 0 else 0
     
-    # Check if unlocked
-    unlocked = fund_pct == 100.0 and norm_pct == 100.0
-    
-    return render_template('review.html',
+    # Aggregates come from the GROUP BY above, so responses are consumed
+    # exactly once, lazily, as the page streams out
+    return stream_template('review.html',
                          attempt=attempt,
-                         responses=responses,
+                         responses=iter_responses(),
                          fund_pct=fund_pct,
                          norm_pct=norm_pct,
                          unlocked=unlocked)
@@ -816,47 +1055,67 @@ def debug_authcheck():
     
     conn = get_db()
     
-    # Get basic counts
-    students_count = conn.execute("SELECT COUNT(*) FROM student").fetchone()[0]
-    lecturers_count = conn.execute("SELECT COUNT(*) FROM lecturer").fetchone()[0]
-    
-    # Get sample student data
-    sample_student = conn.execute("SELECT email, password_hash FROM student LIMIT 1").fetchone()
+    # Counts and a sample student in one round-trip
+    row = conn.execute("""
+        SELECT (SELECT COUNT(*) FROM student) AS students_count,
+               (SELECT COUNT(*) FROM lecturer) AS lecturers_count,
+               s.email, s.password_hash
+        FROM (SELECT 1)
+        LEFT JOIN (SELECT email, password_hash FROM student LIMIT 1) s
+    """).fetchone()
     
     result = {
-        'db_path': os.path.abspath(DB_PATH),
-        'students_count': students_count,
-        'lecturers_count': lecturers_count
+        'db_path': DB_PATH_ABS,
+        'students_count': row['students_count'],
+        'lecturers_count': row['lecturers_count']
     }
     
-    if sample_student:
-        result['sample_student_email'] = sample_student['email']
-        result['hash_prefix'] = sample_student['password_hash'][:12] if sample_student['password_hash'] else None
-        result['hash_is_pbkdf2'] = sample_student['password_hash'].startswith('pbkdf2:') if sample_student['password_hash'] else False
+    if row['email'] is not None:
+        pwhash = row['password_hash']
+        result['sample_student_email'] = row['email']
+        result['hash_prefix'] = pwhash[:12] if pwhash else None
+        result['hash_is_pbkdf2'] = pwhash.startswith('pbkdf2:') if pwhash else False
     
     return jsonify(result)
 
 # --- Lecturer Routes ---
+# The per-category accuracy scans every response; the overview only needs
+# it roughly fresh, so it is recomputed at most once per TTL.
+CATEGORY_STATS_TTL = 60.0
+_category_stats_cache: Dict[str, Any] = {"at": 0.0, "rows": None}
+_category_stats_lock = threading.Lock()
+
+def get_category_stats(conn) -> List[sqlite3.Row]:
+    """Return per-category accuracy rows, cached for CATEGORY_STATS_TTL seconds."""
+    with _category_stats_lock:
+        now = time.monotonic()
+        if _category_stats_cache["rows"] is None or now - _category_stats_cache["at"] > CATEGORY_STATS_TTL:
+            _category_stats_cache["rows"] = conn.execute("""
+                SELECT q.two_category, 
+                       AVG(r.is_correct) as avg_correctness,
+                       COUNT(r.response_id) as response_count
+                FROM quiz q
+                LEFT JOIN response r ON q.quiz_id = r.quiz_id
+                GROUP BY q.two_category
+            """).fetchall()
+            _category_stats_cache["at"] = now
+        return _category_stats_cache["rows"]
+
 @app.route('/admin')
 @lecturer_required
 def admin():
     """Lecturer admin dashboard."""
     conn = get_db()
     
-    # Get basic stats
-    student_count = conn.execute("SELECT COUNT(*) FROM student").fetchone()[0]
-    attempt_count = conn.execute("SELECT COUNT(*) FROM attempt").fetchone()[0]
-    response_count = conn.execute("SELECT COUNT(*) FROM response").fetchone()[0]
+    # Get basic stats in one round-trip
+    student_count, attempt_count, response_count = conn.execute("""
+        SELECT (SELECT COUNT(*) FROM student),
+               (SELECT COUNT(*) FROM attempt),
+               (SELECT COUNT(*) FROM response)
+    """).fetchone()
     
-    # Get category accuracy
-    category_stats = conn.execute("""
-        SELECT q.two_category, 
-               AVG(r.is_correct) as avg_correctness,
-               COUNT(r.response_id) as response_count
-        FROM quiz q
-        LEFT JOIN response r ON q.quiz_id = r.quiz_id
-        GROUP BY q.two_category
-    """).fetchall()
+    # Get category accuracy (short-TTL cache)
+    category_stats = get_category_stats(conn)
     
     # Get 14-day chart data
     chart_data = conn.execute("""
@@ -897,17 +1156,22 @@ def admin_rankings():
     """Student rankings by performance."""
     conn = get_db()
     
+    # Aggregate attempts per student first, then join only the summary rows
     rankings = conn.execute("""
         SELECT s.name, s.email,
-               AVG(a.score_pct) as avg_score,
-               MAX(a.score_pct) as best_score,
-               MIN(a.score_pct) as last_score,
-               COUNT(a.attempt_id) as attempt_count
-        FROM student s
-        LEFT JOIN attempt a ON s.student_id = a.student_id
-        WHERE a.finished_at IS NOT NULL
-        GROUP BY s.student_id
-        ORDER BY avg_score DESC
+               a.avg_score, a.best_score, a.last_score, a.attempt_count
+        FROM (
+            SELECT student_id,
+                   AVG(score_pct) as avg_score,
+                   MAX(score_pct) as best_score,
+                   MIN(score_pct) as last_score,
+                   COUNT(attempt_id) as attempt_count
+            FROM attempt
+            WHERE finished_at IS NOT NULL
+            GROUP BY student_id
+        ) a
+        JOIN student s ON s.student_id = a.student_id
+        ORDER BY a.avg_score DESC
     """).fetchall()
     
     return render_template('admin_rankings.html', rankings=rankings)
@@ -918,13 +1182,19 @@ def admin_questions():
     """Question performance statistics."""
     conn = get_db()
     
+    # Aggregate responses per quiz first, then join only the summary rows
     questions = conn.execute("""
         SELECT q.quiz_id, q.question, q.two_category,
-               AVG(r.is_correct) as correct_rate,
-               COUNT(r.response_id) as response_count
+               r.correct_rate,
+               COALESCE(r.response_count, 0) as response_count
         FROM quiz q
-        LEFT JOIN response r ON q.quiz_id = r.quiz_id
-        GROUP BY q.quiz_id
+        LEFT JOIN (
+            SELECT quiz_id,
+                   AVG(is_correct) as correct_rate,
+                   COUNT(response_id) as response_count
+            FROM response
+            GROUP BY quiz_id
+        ) r ON q.quiz_id = r.quiz_id
         ORDER BY q.quiz_id
     """).fetchall()
     
@@ -936,21 +1206,33 @@ def admin_analytics():
     """Detailed analytics."""
     conn = get_db()
     
-    # Per-student per-question response times
+    # Per-student per-question response times; groups are filtered in one
+    # pass over response before joining names, and the page is capped
     response_times = conn.execute("""
         SELECT s.name, q.quiz_id, q.question,
-               AVG(r.response_time_s) as avg_time,
-               COUNT(r.response_id) as response_count
-        FROM student s
-        JOIN response r ON s.student_id = r.student_id
-        JOIN quiz q ON r.quiz_id = q.quiz_id
-        GROUP BY s.student_id, q.quiz_id
-        HAVING response_count >= 5
-        ORDER BY avg_time DESC
+               hot.avg_time, hot.response_count
+        FROM (
+            SELECT student_id, quiz_id,
+                   AVG(response_time_s) as avg_time,
+                   COUNT(*) as response_count
+            FROM response
+            GROUP BY student_id, quiz_id
+            HAVING COUNT(*) >= 5
+        ) hot
+        JOIN student s ON s.student_id = hot.student_id
+        JOIN quiz q ON q.quiz_id = hot.quiz_id
+        ORDER BY hot.avg_time DESC
+        LIMIT 200
     """).fetchall()
     
     return render_template('admin_analytics.html', response_times=response_times)
 
+@app.route('/admin/reload_quiz_cache', methods=['POST'])
+@lecturer_required
+def reload_quiz_cache():
+    """Drop the cached quiz payloads and answer key after quiz content is edited."""
+    return jsonify({'ok': True, 'version': invalidate_quiz_cache()})
+
 # --- Error Handlers ---
 @app.errorhandler(404)
 def not_found(error):
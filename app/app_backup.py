@@ -24,26 +24,48 @@ import sqlite3
 import random
 import re
 import shutil
+import hashlib
+import time
+import queue
+import threading
+import atexit
+from collections import namedtuple
+from contextlib import contextmanager
 from datetime import datetime
-from functools import wraps
+from functools import lru_cache, wraps
 from typing import Any, Dict, List, Optional
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask import (
     Flask, g, session, request, redirect, url_for,
-    render_template, flash, jsonify
+    render_template, stream_template, flash, jsonify
 )
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # optional speedup; jsonify is used otherwise
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:  # optional; responses go out uncompressed otherwise
+    Compress = None
+
 # --- Configuration & Setup ---
 load_dotenv()
 app = Flask(__name__, static_folder="static", template_folder="templates")
 app.secret_key = os.environ.get("FLASK_SECRET", "dev-secret-plai")
 app.config["JSON_SORT_KEYS"] = False
+# br/gzip negotiated from Accept-Encoding; bodies under COMPRESS_MIN_SIZE (500 B) are left alone.
+# Streamed responses (the review page) pass through so they still flush progressively.
+app.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+app.config["COMPRESS_STREAMS"] = False
+if Compress is not None:
+    Compress(app)
 DB_PATH = os.environ.get("PLA_DB", os.path.join(os.path.dirname(__file__), "pla.db"))
+POOL_SIZE = 2 * (os.cpu_count() or 1) + 1
 BACKUPS_DIR = os.path.join(os.path.dirname(__file__), "backups")
 os.makedirs(BACKUPS_DIR, exist_ok=True)
-ADMIN_PW_HASH = generate_password_hash("Admin123!")
-STUDENT_PW_HASH = generate_password_hash("Student123!")
 TZ_INFO = None
 try:
     from zoneinfo import ZoneInfo
@@ -87,18 +109,44 @@ QUIZ_BANK_30 = [
     {"question": "What is a database index?", "two_category": "Normalization & Dependencies", "options": ["A data structure that improves query performance", "A table relationship", "A data type", "A constraint"], "correct_text": "A data structure that improves query performance", "explanation": "A database index is a data structure that improves the speed of data retrieval operations on a database table."},
 ]
 
+# The bank is static: encode each option list once for storage and keep a
+# decoded tuple for serving.
+for q in QUIZ_BANK_30:
+    q['_options_json'] = json.dumps(q['options'][:4])
+    q['_options_tuple'] = tuple(q['options'][:4])
+OPTIONS_BY_QUESTION = {q['question']: q['_options_tuple'] for q in QUIZ_BANK_30}
+
+# Insert-ready quiz rows, built once at import
+QUIZ_SEED_ROWS = [
+    (q['question'], q['_options_json'], q['correct_text'], q['two_category'], q['explanation'])
+    for q in QUIZ_BANK_30
+]
+
 # --- Helper Functions ---
 
+# Demo credential hashes are only derived when a seed actually needs them,
+# so worker start-up does not pay for PBKDF2.
+@lru_cache(maxsize=None)
+def _admin_hash() -> str:
+    return generate_password_hash("Admin123!")
+
+@lru_cache(maxsize=None)
+def _student_hash() -> str:
+    return generate_password_hash("Student123!")
+
 def now_str():
     if TZ_INFO:
         return datetime.now(TZ_INFO).strftime("%Y-%m-%d %H:%M:%S")
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+_NORMALIZE_RE = re.compile(r"[^a-z0-9.]+")
+_SLUG_RE = re.compile(r"[^A-Za-z0-9 ]+")
+
 def normalize_text(s: str) -> str:
-    return re.sub(r"[^a-z0-9.]+", "", s.lower())
+    return _NORMALIZE_RE.sub("", s.lower())
 
 def slug_email(full_name: str, collision_id: int = 0) -> str:
-    s = re.sub(r"[^A-Za-z0-9 ]+", "", full_name).strip()
+    s = _SLUG_RE.sub("", full_name).strip()
     parts = s.split()
     base = "student"
     if parts:
@@ -113,6 +161,18 @@ def slug_email(full_name: str, collision_id: int = 0) -> str:
 
 # --- DB Initialization and Seeding ---
 
+# Indexes for the hot attempt lookups, per-attempt/per-quiz response joins and
+# the finished-attempt filters used by the dashboard and admin views
+INDEX_DDL = """
+    CREATE INDEX IF NOT EXISTS idx_attempt_student_started ON attempt(student_id, started_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_attempt_student_open ON attempt(student_id, finished_at, started_at);
+    CREATE INDEX IF NOT EXISTS idx_response_student_quiz ON response(student_id, quiz_id);
+    CREATE INDEX IF NOT EXISTS idx_resp_attempt ON response(attempt_id);
+    CREATE INDEX IF NOT EXISTS idx_resp_quiz ON response(quiz_id);
+    CREATE INDEX IF NOT EXISTS idx_attempt_student_finished ON attempt(student_id, finished_at)
+        WHERE finished_at IS NOT NULL;
+"""
+
 def ensure_schema_and_seed(conn: sqlite3.Connection):
     """Ensures tables exist and seeds minimal data (lecturer and quiz bank)."""
     
@@ -147,13 +207,14 @@ def ensure_schema_and_seed(conn: sqlite3.Connection):
         -- Ensure required columns exist (non-destructive migrations)
         -- Note: ALTER TABLE ADD COLUMN IF NOT EXISTS is not supported in older SQLite versions
         -- These columns are already included in the CREATE TABLE statements above
-    """)
+    """ + INDEX_DDL)
 
     # 2. Seed Lecturer (Admin)
     cur = conn.cursor()
-    cur.execute("INSERT OR IGNORE INTO lecturer (name, email, password_hash) VALUES (?, ?, ?)",
-        ("Admin Lecturer", "admin@lct.edu", ADMIN_PW_HASH)
-    )
+    if not conn.execute("SELECT 1 FROM lecturer WHERE email = ?", ("admin@lct.edu",)).fetchone():
+        cur.execute("INSERT OR IGNORE INTO lecturer (name, email, password_hash) VALUES (?, ?, ?)",
+            ("Admin Lecturer", "admin@lct.edu", _admin_hash())
+        )
     conn.commit()
 
     # 3. Purge legacy quiz data and insert the 30-question bank
@@ -165,11 +226,14 @@ def ensure_schema_and_seed(conn: sqlite3.Connection):
         WHERE two_category NOT IN (?, ?) OR two_category IS NULL OR two_category = ''
     """, allowed_topics).fetchall()
     
+    # Purge and reseed share one transaction
+    conn.execute("BEGIN")
     if legacy_ids:
         ids_to_delete = [row['quiz_id'] for row in legacy_ids]
         qmarks = ",".join(["?"] * len(ids_to_delete))
         cur.execute(f"DELETE FROM response WHERE quiz_id IN ({qmarks})", ids_to_delete)
         cur.execute(f"DELETE FROM quiz WHERE quiz_id IN ({qmarks})", ids_to_delete)
+        invalidate_quiz_cache()
         print(f"[CLEAN] Purged {len(ids_to_delete)} legacy quiz rows and related responses.")
 
     # Check remaining count before hard reset of the quiz table
@@ -178,15 +242,11 @@ def ensure_schema_and_seed(conn: sqlite3.Connection):
     if current_count != 30:
         # If count is wrong, wipe quiz table and insert 30 clean ones
         cur.execute("DELETE FROM quiz")
-        for i, q_data in enumerate(QUIZ_BANK_30):
-            # Ensure options are in a JSON array format for storage
-            options_json = json.dumps(q_data['options'][:4])
-            
-            cur.execute("""
-                INSERT INTO quiz (question, options_text, correct_answer, two_category, explanation)
-                VALUES (?, ?, ?, ?, ?)
-            """, (q_data['question'], options_json, q_data['correct_text'], 
-                  q_data['two_category'], q_data['explanation']))
+        cur.executemany("""
+            INSERT INTO quiz (question, options_text, correct_answer, two_category, explanation)
+            VALUES (?, ?, ?, ?, ?)
+        """, QUIZ_SEED_ROWS)
+        invalidate_quiz_cache()
         print(f"[SEED] Inserted 30 clean questions into quiz bank.")
     
     conn.commit()
@@ -194,27 +254,290 @@ def ensure_schema_and_seed(conn: sqlite3.Connection):
     if final_count != 30:
         print(f"[ERROR] Final quiz bank count is {final_count}. Must be 30.")
 
+# Running per-question totals behind the admin views. Triggers keep them in
+# step with every response insert/delete/update, including the INSERT OR
+# REPLACE in submit_quiz (needs recursive_triggers so REPLACE fires DELETE).
+QUIZ_STATS_DDL = """
+    CREATE TABLE IF NOT EXISTS quiz_stats (
+        quiz_id INTEGER PRIMARY KEY, n INTEGER NOT NULL DEFAULT 0,
+        sum_score INTEGER NOT NULL DEFAULT 0, sum_time REAL NOT NULL DEFAULT 0,
+        n_timed INTEGER NOT NULL DEFAULT 0, sum_time_timed REAL NOT NULL DEFAULT 0
+    );
+    CREATE TRIGGER IF NOT EXISTS trg_quiz_stats_ins AFTER INSERT ON response BEGIN
+        INSERT INTO quiz_stats (quiz_id, n, sum_score, sum_time, n_timed, sum_time_timed)
+        VALUES (NEW.quiz_id, 1, COALESCE(NEW.score, 0), COALESCE(NEW.response_time_s, 0),
+                NEW.response_time_s > 0, CASE WHEN NEW.response_time_s > 0 THEN NEW.response_time_s ELSE 0 END)
+        ON CONFLICT(quiz_id) DO UPDATE SET
+            n = n + 1,
+            sum_score = sum_score + excluded.sum_score,
+            sum_time = sum_time + excluded.sum_time,
+            n_timed = n_timed + excluded.n_timed,
+            sum_time_timed = sum_time_timed + excluded.sum_time_timed;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_quiz_stats_del AFTER DELETE ON response BEGIN
+        UPDATE quiz_stats SET
+            n = n - 1,
+            sum_score = sum_score - COALESCE(OLD.score, 0),
+            sum_time = sum_time - COALESCE(OLD.response_time_s, 0),
+            n_timed = n_timed - (OLD.response_time_s > 0),
+            sum_time_timed = sum_time_timed - CASE WHEN OLD.response_time_s > 0 THEN OLD.response_time_s ELSE 0 END
+        WHERE quiz_id = OLD.quiz_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_quiz_stats_upd
+    AFTER UPDATE OF quiz_id, score, response_time_s ON response BEGIN
+        UPDATE quiz_stats SET
+            n = n - 1,
+            sum_score = sum_score - COALESCE(OLD.score, 0),
+            sum_time = sum_time - COALESCE(OLD.response_time_s, 0),
+            n_timed = n_timed - (OLD.response_time_s > 0),
+            sum_time_timed = sum_time_timed - CASE WHEN OLD.response_time_s > 0 THEN OLD.response_time_s ELSE 0 END
+        WHERE quiz_id = OLD.quiz_id;
+        INSERT INTO quiz_stats (quiz_id, n, sum_score, sum_time, n_timed, sum_time_timed)
+        VALUES (NEW.quiz_id, 1, COALESCE(NEW.score, 0), COALESCE(NEW.response_time_s, 0),
+                NEW.response_time_s > 0, CASE WHEN NEW.response_time_s > 0 THEN NEW.response_time_s ELSE 0 END)
+        ON CONFLICT(quiz_id) DO UPDATE SET
+            n = n + 1,
+            sum_score = sum_score + excluded.sum_score,
+            sum_time = sum_time + excluded.sum_time,
+            n_timed = n_timed + excluded.n_timed,
+            sum_time_timed = sum_time_timed + excluded.sum_time_timed;
+    END;
+"""
+
+def ensure_quiz_stats(conn: sqlite3.Connection):
+    """Create quiz_stats and its triggers; backfill from response on first creation."""
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='quiz_stats'").fetchone()
+    conn.executescript(QUIZ_STATS_DDL)
+    if not exists:
+        conn.execute("""
+            INSERT INTO quiz_stats (quiz_id, n, sum_score, sum_time, n_timed, sum_time_timed)
+            SELECT quiz_id, COUNT(*), COALESCE(SUM(score), 0), COALESCE(SUM(response_time_s), 0),
+                   SUM(response_time_s > 0), COALESCE(SUM(CASE WHEN response_time_s > 0 THEN response_time_s END), 0)
+            FROM response
+            GROUP BY quiz_id
+        """)
+        conn.commit()
+
+def ensure_attempt_day(conn: sqlite3.Connection):
+    """Add attempt.started_day (the date part of started_at) and index it for the activity chart."""
+    # Generated columns only show up in table_xinfo, and ALTER TABLE can only add VIRTUAL ones
+    cols = {r[1] for r in conn.execute("PRAGMA table_xinfo(attempt)")}
+    if "started_day" not in cols:
+        conn.execute("""
+            ALTER TABLE attempt ADD COLUMN started_day TEXT
+            GENERATED ALWAYS AS (substr(started_at, 1, 10)) VIRTUAL
+        """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_attempt_day ON attempt(started_day)
+        WHERE finished_at IS NOT NULL
+    """)
+    conn.commit()
+
+def ensure_quiz_category_code(conn: sqlite3.Connection):
+    """Add quiz.category_code: 0 = Fundamentals, 1 = Normalization, 2 = anything else."""
+    # Derived from two_category, so reseeding the bank never leaves it stale
+    cols = {r[1] for r in conn.execute("PRAGMA table_xinfo(quiz)")}
+    if "category_code" not in cols:
+        conn.execute("""
+            ALTER TABLE quiz ADD COLUMN category_code INTEGER
+            GENERATED ALWAYS AS (CASE two_category
+                WHEN 'Data Modeling & DBMS Fundamentals' THEN 0
+                WHEN 'Normalization & Dependencies' THEN 1
+                ELSE 2 END) VIRTUAL
+        """)
+        conn.commit()
+
+def refresh_lifetime_mastery(conn: sqlite3.Connection, student_id: Optional[int] = None):
+    """Recompute the stored per-topic lifetime correct counts (one student, or everyone)."""
+    where, params = ("WHERE student_id = ?", (student_id,)) if student_id is not None else ("", ())
+    # One pass over each student's responses tallies both topics by integer code
+    conn.execute(f"""
+        UPDATE student SET (lifetime_fund_correct, lifetime_norm_correct) = (
+            SELECT COALESCE(SUM(CASE WHEN q.category_code = 0 THEN r.score END), 0),
+                   COALESCE(SUM(CASE WHEN q.category_code = 1 THEN r.score END), 0)
+            FROM response r JOIN quiz q ON q.quiz_id = r.quiz_id
+            WHERE r.student_id = student.student_id)
+        {where}
+    """, params)
+
+def ensure_student_mastery(conn: sqlite3.Connection, refresh: bool = False):
+    """Add the lifetime mastery columns to student, backfilling when added or when asked."""
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(student)")}
+    if "lifetime_fund_correct" not in cols:
+        conn.execute("ALTER TABLE student ADD COLUMN lifetime_fund_correct INTEGER NOT NULL DEFAULT 0")
+        conn.execute("ALTER TABLE student ADD COLUMN lifetime_norm_correct INTEGER NOT NULL DEFAULT 0")
+        refresh = True
+    if refresh:
+        refresh_lifetime_mastery(conn)
+    conn.commit()
+
 # --- App Context & DB Connection ---
 
+def _set_journal_mode():
+    # journal_mode is stored in the database file, so it is set and checked once
+    # at startup rather than on every connection.
+    # WAL lets readers proceed during a write; set SQLITE_WAL=0 on network filesystems
+    wanted = "wal" if os.environ.get("SQLITE_WAL", "1") != "0" else "delete"
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        mode = conn.execute(f"PRAGMA journal_mode={wanted}").fetchone()[0]
+    finally:
+        conn.close()
+    if mode.lower() != wanted:
+        print(f"[DB] journal_mode is {mode}, wanted {wanted}; readers may block on writes.")
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
+    conn.row_factory = sqlite3.Row
+    conn.executescript("""
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA cache_size=-65536;
+        PRAGMA mmap_size=268435456;
+        PRAGMA busy_timeout=5000;
+        PRAGMA recursive_triggers=ON;
+        PRAGMA foreign_keys=ON;
+    """)
+    return conn
+
+# Reader connections stay open across requests; writes go through one
+# dedicated connection so concurrent writers queue here instead of on the file lock.
+_set_journal_mode()
+_POOL: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=POOL_SIZE)
+for _ in range(POOL_SIZE):
+    _POOL.put(_connect())
+_WRITER = _connect()
+_WRITE_LOCK = threading.Lock()
+_SEEDED = False
+
+@atexit.register
+def _close_pool():
+    while True:
+        try:
+            _POOL.get_nowait().close()
+        except queue.Empty:
+            break
+    _WRITER.close()
+
+def _ensure_schema():
+    # Auto-run schema/seed/migrations on first access
+    global _SEEDED
+    if _SEEDED:
+        return
+    with _WRITE_LOCK:
+        if _SEEDED:
+            return
+        # Integrity probe: the full seed path only runs when the bank is off
+        tables = {r[0] for r in _WRITER.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name IN ('student', 'quiz')")}
+        reseeded = False
+        if len(tables) == 2 and _WRITER.execute("SELECT COUNT(*) FROM quiz").fetchone()[0] == 30:
+            # Existing databases still pick up newly added indexes
+            _WRITER.executescript(INDEX_DDL)
+        else:
+            ensure_schema_and_seed(_WRITER)
+            reseeded = True
+        ensure_quiz_stats(_WRITER)
+        ensure_attempt_day(_WRITER)
+        ensure_quiz_category_code(_WRITER)
+        # A reseed can purge responses or change quiz categories
+        ensure_student_mastery(_WRITER, refresh=reseeded)
+        _SEEDED = True
+
+@contextmanager
+def write_db():
+    """Serialized access to the writer connection, inside one BEGIN IMMEDIATE
+    transaction that commits on success."""
+    _ensure_schema()
+    with _WRITE_LOCK:
+        # Take the database write lock up front, so read-then-write blocks
+        # (register, quiz) are atomic across processes too.
+        _WRITER.execute("BEGIN IMMEDIATE")
+        try:
+            yield _WRITER
+            _WRITER.commit()
+        except Exception:
+            _WRITER.rollback()
+            raise
+
 @app.teardown_appcontext
 def close_db(_: Any):
     db = g.pop("db", None)
     if db is not None:
-        db.close()
+        db.rollback()
+        _POOL.put(db)
 
 def get_db() -> sqlite3.Connection:
     if "db" not in g:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA foreign_keys=ON")
-        
-        # Auto-run schema/seed/migrations on first access
-        if not conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='student'").fetchone():
-            ensure_schema_and_seed(conn)
-
-        g.db = conn
+        _ensure_schema()
+        g.db = _POOL.get()
     return g.db
 
+# namedtuple class per result layout; cursor.description is stable per statement
+_ROW_TYPES: Dict[tuple, type] = {}
+
+def nt_row(cursor: sqlite3.Cursor, row: tuple):
+    """Row factory yielding namedtuples: lighter than sqlite3.Row, same r.col access."""
+    desc = cursor.description
+    cls = _ROW_TYPES.get(desc)
+    if cls is None:
+        cls = _ROW_TYPES[desc] = namedtuple("R", [c[0] for c in desc], rename=True)
+    return cls(*row)
+
+def query_nt(conn: sqlite3.Connection, sql: str, params=()) -> sqlite3.Cursor:
+    """Execute on a cursor that returns namedtuple rows (templates index them as r['col'] too)."""
+    cur = conn.cursor()
+    cur.row_factory = nt_row
+    return cur.execute(sql, params)
+
+# --- Quiz Bank Cache ---
+# The bank only changes when ensure_schema_and_seed rewrites it, so the rows are
+# read once and kept in-process with options already decoded.
+_QUIZ_CACHE: List[Dict[str, Any]] = []
+# quiz_id -> (correct_answer, two_category), filled alongside _QUIZ_CACHE
+QUIZ_LOOKUP: Dict[int, tuple] = {}
+# (payload base dict, options tuple) per question; only "options" is filled per request
+_QUIZ_TEMPLATES: List[tuple] = []
+# Digest of the cached bank; part of every /api/quiz_progressive ETag
+_QUIZ_ETAG = ""
+
+def invalidate_quiz_cache():
+    global _QUIZ_ETAG
+    _QUIZ_CACHE.clear()
+    QUIZ_LOOKUP.clear()
+    _QUIZ_TEMPLATES.clear()
+    _QUIZ_ETAG = ""
+
+def get_quiz_cache(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    global _QUIZ_ETAG
+    if not _QUIZ_CACHE:
+        rows = conn.execute("""
+            SELECT quiz_id, question, options_text, correct_answer, two_category, explanation
+            FROM quiz
+        """).fetchall()
+        # Build fully before publishing so concurrent first calls cannot double-fill
+        _QUIZ_CACHE[:] = [{
+            "quiz_id": r['quiz_id'],
+            "question": r['question'],
+            "two_category": r['two_category'],
+            "explanation": r['explanation'],
+            "options_tuple": OPTIONS_BY_QUESTION.get(r['question'])
+                             or tuple(json.loads(r['options_text'] or '[]')),
+            "correct_answer": r['correct_answer'],
+        } for r in rows]
+        QUIZ_LOOKUP.update((q['quiz_id'], (q['correct_answer'], q['two_category'])) for q in _QUIZ_CACHE)
+        _QUIZ_TEMPLATES[:] = [({
+            "quiz_id": q['quiz_id'],
+            "question": q['question'],
+            "two_category": q['two_category'],
+            "explanation": q['explanation'],
+            "options": None,
+            # Correct text is NOT sent, but we store it for server-side score validation
+            "correct_text_hidden": q['correct_answer'],
+        }, q['options_tuple']) for q in _QUIZ_CACHE]
+        _QUIZ_ETAG = hashlib.md5(json.dumps(_QUIZ_CACHE, sort_keys=True).encode()).hexdigest()
+    return _QUIZ_CACHE
+
 # --- Logic Helpers ---
 
 def now_str_db():
@@ -229,48 +552,83 @@ def get_latest_attempt(student_id: int):
         ).fetchone()
 
 # Placeholder for lifetime best calculation
+class LifetimeMastery:
+    def __init__(self, fund_pts: float, norm_pts: float):
+        self.fund_pts = fund_pts
+        self.norm_pts = norm_pts
+        self.overall_points = fund_pts + norm_pts
+
+def lifetime_mastery_from_totals(fund_correct, norm_correct) -> LifetimeMastery:
+    # The logic here is simplified to match the goal: total correct / max possible per topic (15)
+    fund_correct = min(int(fund_correct or 0), 15)
+    norm_correct = min(int(norm_correct or 0), 15)
+    return LifetimeMastery(
+        round((fund_correct / 15.0) * 50.0, 1),
+        round((norm_correct / 15.0) * 50.0, 1),
+    )
+
 def get_lifetime_mastery(student_id: int):
     # This requires lifetime aggregation over *all* finished attempts (score_pct > 0)
-    # The logic here is simplified to match the goal: total correct / max possible per topic (15)
+    # The per-topic totals are kept on the student row (see refresh_lifetime_mastery).
     with get_db() as conn:
-        # Use MAX score_pct per topic across all finished attempts
-        # NOTE: This query is complex as it requires aggregation *before* MAX, so we simplify the goal
-        # to total correct responses ever, capped at 15.
-        
-        totals = conn.execute("""
-            SELECT q.two_category AS cat, 
-            SUM(r.score) AS lifetime_correct
-            FROM response r
-            JOIN quiz q ON q.quiz_id = r.quiz_id
-            WHERE r.student_id = ?
-            GROUP BY q.two_category
-        """, (student_id,)).fetchall()
-        
-        fund_correct = 0
-        norm_correct = 0
-        
-        for row in totals:
-            if row['cat'] == 'Data Modeling & DBMS Fundamentals':
-                fund_correct = min(int(row['lifetime_correct'] or 0), 15)
-            elif row['cat'] == 'Normalization & Dependencies':
-                norm_correct = min(int(row['lifetime_correct'] or 0), 15)
-        
-        fund_pts = round((fund_correct / 15.0) * 50.0, 1)
-        norm_pts = round((norm_correct / 15.0) * 50.0, 1)
-
-        class LifetimeMastery:
-            def __init__(self):
-                self.fund_pts = fund_pts
-                self.norm_pts = norm_pts
-                self.overall_points = fund_pts + norm_pts
-        return LifetimeMastery()
+        row = conn.execute(
+            "SELECT lifetime_fund_correct, lifetime_norm_correct FROM student WHERE student_id = ?",
+            (student_id,)
+        ).fetchone()
+    if not row:
+        return lifetime_mastery_from_totals(0, 0)
+    return lifetime_mastery_from_totals(row['lifetime_fund_correct'], row['lifetime_norm_correct'])
+
+def ojson(obj: Any):
+    """JSON response serialized with orjson when available (UTF-8, no key sorting)."""
+    if orjson is None:
+        return jsonify(obj)
+    return app.response_class(orjson.dumps(obj), mimetype="application/json")
+
+def json_body() -> Any:
+    """Parsed JSON request body, or None if it is missing or invalid (like get_json(silent=True))."""
+    if orjson is None:
+        return request.get_json(silent=True)
+    if not request.is_json:
+        return None
+    try:
+        return orjson.loads(request.get_data())
+    except orjson.JSONDecodeError:
+        return None
 
 # --- Security and Permissions ---
 
+@app.before_request
+def load_session_ids():
+    """Copy the session's role and ids onto g once per request."""
+    g.role = session.get("role")
+    g.student_id = session.get("student_id")
+    g.lecturer_id = session.get("lecturer_id")
+
+# Successful (stored hash, keyed digest of password) pairs; failed guesses and
+# plaintexts are never kept. The digest key is random per process.
+_VERIFIED: Dict[tuple, None] = {}
+_VERIFIED_MAX = 1024
+_VERIFIED_LOCK = threading.Lock()
+_VERIFY_KEY = os.urandom(16)
+
+def _verify(pw_hash: str, pw: str) -> bool:
+    # Keyed on the stored hash, so a password change misses the cache naturally
+    key = (pw_hash, hashlib.blake2b(pw.encode("utf-8"), key=_VERIFY_KEY).digest())
+    if key in _VERIFIED:
+        return True
+    if not check_password_hash(pw_hash, pw):
+        return False
+    with _VERIFIED_LOCK:
+        if len(_VERIFIED) >= _VERIFIED_MAX:
+            del _VERIFIED[next(iter(_VERIFIED))]  # oldest first
+        _VERIFIED[key] = None
+    return True
+
 def login_required(f):
     @wraps(f)
     def wrapped(*args, **kwargs):
-        if not session.get("student_id") and session.get("role") != "lecturer":
+        if not g.student_id and g.role != "lecturer":
             return redirect(url_for("login"))
         return f(*args, **kwargs)
     return wrapped
@@ -278,7 +636,7 @@ def login_required(f):
 def student_required(f):
     @wraps(f)
     def wrapped(*args, **kwargs):
-        if session.get("role") != "student" or not session.get("student_id"):
+        if g.role != "student" or not g.student_id:
             flash("Access denied.", "error")
             return redirect(url_for("login"))
         return f(*args, **kwargs)
@@ -287,7 +645,7 @@ def student_required(f):
 def lecturer_required(f):
     @wraps(f)
     def wrapped(*args, **kwargs):
-        if session.get("role") != "lecturer":
+        if g.role != "lecturer":
             flash("Access denied.", "error")
             return redirect(url_for("login"))
         return f(*args, **kwargs)
@@ -297,11 +655,11 @@ def lecturer_required(f):
 
 @app.route("/")
 def index():
-    if session.get("role") == "lecturer":
+    if g.role == "lecturer":
         return redirect(url_for("admin_overview"))
-    elif session.get("student_id"):
+    elif g.student_id:
         # Student: land on latest review or quiz
-        latest_attempt = get_latest_attempt(session["student_id"])
+        latest_attempt = get_latest_attempt(g.student_id)
         if latest_attempt and latest_attempt['finished_at']:
             return redirect(url_for("review", attempt_id=latest_attempt["attempt_id"]))
         return redirect(url_for("quiz"))
@@ -316,7 +674,7 @@ def login():
         with get_db() as conn:
             # Try student
             stu = conn.execute("SELECT student_id, password_hash FROM student WHERE email = ?", (email,)).fetchone()
-            if stu and check_password_hash(stu["password_hash"], password):
+            if stu and _verify(stu["password_hash"], password):
                 session.clear()
                 session["student_id"] = int(stu["student_id"])
                 session["role"] = "student"
@@ -324,7 +682,7 @@ def login():
 
             # Try lecturer
             lec = conn.execute("SELECT lecturer_id, password_hash FROM lecturer WHERE email = ?", (email,)).fetchone()
-            if lec and check_password_hash(lec["password_hash"], password):
+            if lec and _verify(lec["password_hash"], password):
                 session.clear()
                 session["lecturer_id"] = int(lec["lecturer_id"])
                 session["role"] = "lecturer"
@@ -347,7 +705,7 @@ def register():
             flash("Please fill all fields", "error")
             return render_template("register.html")
 
-        with get_db() as conn:
+        with write_db() as conn:
             exists = conn.execute("SELECT 1 FROM student WHERE email = ?", (email,)).fetchone()
             if exists:
                 flash("Email already registered", "error")
@@ -357,7 +715,6 @@ def register():
                 "INSERT INTO student (name, email, password_hash, program) VALUES (?, ?, ?, ?)",
                 (name, email, generate_password_hash(password), program)
             )
-            conn.commit()
             
             flash("Registration successful. Please login.", "success")
             return redirect(url_for("login"))
@@ -375,21 +732,18 @@ def logout():
 @student_required
 def quiz():
     # Resume last in-progress attempt or create a new one
-    student_id = session['student_id']
-    with get_db() as conn:
+    student_id = g.student_id
+    with write_db() as conn:
+        # Create an attempt only if none is in progress, then read back the active one
+        conn.execute("""
+            INSERT INTO attempt (student_id, started_at, source)
+            SELECT ?, ?, 'web'
+            WHERE NOT EXISTS (SELECT 1 FROM attempt WHERE student_id = ? AND finished_at IS NULL)
+        """, (student_id, now_str_db(), student_id))
         active_attempt = conn.execute(
             "SELECT attempt_id FROM attempt WHERE student_id = ? AND finished_at IS NULL ORDER BY started_at DESC LIMIT 1",
             (student_id,)
         ).fetchone()
-
-        if not active_attempt:
-            # Create new attempt
-            cur = conn.execute(
-                "INSERT INTO attempt (student_id, started_at, source) VALUES (?, ?, 'web')",
-                (student_id, now_str_db())
-            )
-            conn.commit()
-            active_attempt = {'attempt_id': cur.lastrowid}
     
     return render_template("quiz.html", attempt_id=active_attempt['attempt_id'])
 
@@ -397,87 +751,87 @@ def quiz():
 @student_required
 def api_quiz_progressive():
     # Return all 30 questions randomized
-    with get_db() as conn:
-        rows = conn.execute("""
-            SELECT quiz_id, question, options_text, correct_answer, two_category, explanation
-            FROM quiz
-            ORDER BY RANDOM()
-        """).fetchall()
+    get_quiz_cache(get_db())
+    attempt_id = request.args.get("attempt_id", type=int)
+    etag = None
+    rng = random
+    if attempt_id:
+        # One stable order per (bank, student, attempt): a reload of the same
+        # attempt can be answered with 304 and the browser's cached copy.
+        etag = hashlib.md5(f"{_QUIZ_ETAG}:{g.student_id}:{attempt_id}".encode()).hexdigest()
+        # Flask-Compress rewrites the tag to "<etag>:br" / "<etag>:gzip" on compressed bodies.
+        for tag in (etag, *(f"{etag}:{alg}" for alg in app.config["COMPRESS_ALGORITHM"])):
+            if request.if_none_match.contains(tag):
+                resp = app.response_class(status=304)
+                resp.set_etag(tag)
+                return resp
+        rng = random.Random(etag)
 
     out = []
-    for r in rows:
-        # Options are stored as JSON list of text. Shuffle them before sending.
-        options_list = json.loads(r['options_text'] or '[]')
-        random.shuffle(options_list)
-        
-        item = {
-            "quiz_id": r['quiz_id'],
-            "question": r['question'],
-            "two_category": r['two_category'],
-            "explanation": r['explanation'],
-            "options": options_list,
-            # Correct text is NOT sent, but we store it for server-side score validation
-            "correct_text_hidden": r['correct_answer'] 
-        }
+    for base, options in rng.sample(_QUIZ_TEMPLATES, len(_QUIZ_TEMPLATES)):
+        # Options are cached as a tuple of text. Shuffle a copy before sending.
+        item = base.copy()
+        item["options"] = rng.sample(options, len(options))
         out.append(item)
 
-    return jsonify(out)
+    resp = ojson(out)
+    if etag:
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
 
 @app.route("/submit", methods=["POST"])
 @student_required
 def submit_quiz():
-    data = request.get_json(silent=True) or {}
+    data = json_body() or {}
     attempt_id = data.get("attempt_id")
     answers: List[Dict[str, Any]] = data.get("answers", []) # answers is a list of dicts: {quiz_id, chosen_text, time_sec}
 
     if not attempt_id:
-        return jsonify({"error": "No attempt ID"}), 400
+        return ojson({"error": "No attempt ID"}), 400
 
-    student_id = session["student_id"]
+    student_id = g.student_id
     correct_count = 0
-    total_responses = 0
-
-    with get_db() as conn:
-        # Fetch correct answers and explanations for grading
-        quiz_data = conn.execute("SELECT quiz_id, correct_answer, two_category FROM quiz").fetchall()
-        quiz_map = {row['quiz_id']: {'correct': row['correct_answer'], 'category': row['two_category']} for row in quiz_data}
-        
-        for ans in answers:
-            qid = ans.get('quiz_id')
-            chosen_text = str(ans.get('chosen_text') or "").strip()
-            time_sec = float(ans.get('time_sec') or 0.0)
-            
-            if qid not in quiz_map: continue
-            
-            total_responses += 1
-            correct_text = quiz_map[qid]['correct']
-            
-            is_correct = (chosen_text == correct_text)
-            score = 1 if is_correct else 0
-
-            if is_correct: correct_count += 1
-
-            # Save response (storing the actual text the user chose)
-            conn.execute("""
-                INSERT OR REPLACE INTO response
-                (student_id, attempt_id, quiz_id, answer_text, score, response_time_s)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (student_id, attempt_id, qid, chosen_text, score, time_sec))
 
-        # Update attempt with final score
-        score_pct = round((correct_count / total_responses) * 100.0, 1) if total_responses else 0.0
-        
+    # Correct answers come from the in-process quiz cache
+    get_quiz_cache(get_db())
+
+    # Grade in Python first so the writer is only held for the batched writes
+    rows = []
+    for ans in answers:
+        qid = ans.get('quiz_id')
+        entry = QUIZ_LOOKUP.get(qid)
+        if not entry: continue
+        correct_text, _ = entry
+
+        # Store the actual text the user chose
+        chosen_text = str(ans.get('chosen_text') or "").strip()
+        score = 1 if chosen_text == correct_text else 0
+        correct_count += score
+        rows.append((student_id, attempt_id, qid, chosen_text, score, float(ans.get('time_sec') or 0.0)))
+    total_responses = len(rows)
+
+    # Update attempt with final score
+    score_pct = round((correct_count / total_responses) * 100.0, 1) if total_responses else 0.0
+
+    with write_db() as conn:
+        conn.executemany("""
+            INSERT OR REPLACE INTO response
+            (student_id, attempt_id, quiz_id, answer_text, score, response_time_s)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, rows)
         conn.execute("""
             UPDATE attempt
             SET finished_at = ?, score_pct = ?, items_total = ?, items_correct = ?
             WHERE attempt_id = ?
         """, (now_str_db(), score_pct, total_responses, correct_count, attempt_id))
-        
-        conn.commit()
+        refresh_lifetime_mastery(conn, student_id)
+    # Lecturer overview reflects the new attempt immediately
+    _admin_overview_payload.cache_clear()
 
     print(f"[SUBMIT] sid={student_id} attempt={attempt_id} total={total_responses} correct={correct_count} pct={score_pct}")
     
-    return jsonify({
+    return ojson({
             "ok": True,
             "score": score_pct,
         "correct": correct_count,
@@ -488,7 +842,7 @@ def submit_quiz():
 @app.route("/review/<int:attempt_id>")
 @student_required
 def review(attempt_id: int):
-    student_id = session["student_id"]
+    student_id = g.student_id
     with get_db() as conn:
         attempt = conn.execute(
             "SELECT * FROM attempt WHERE attempt_id = ? AND student_id = ?",
@@ -499,20 +853,33 @@ def review(attempt_id: int):
             flash("Attempt not found", "error")
             return redirect(url_for("student_dashboard", student_id=student_id))
         
-        items = conn.execute("""
+        # Executed up front so SQL errors still fail the request before streaming starts
+        items_cur = query_nt(conn, """
             SELECT r.answer_text AS chosen, r.score, r.response_time_s,
                    q.quiz_id, q.question, q.correct_answer AS correct, q.explanation, q.two_category
             FROM response r
             JOIN quiz q ON q.quiz_id = r.quiz_id
             WHERE r.attempt_id = ?
             ORDER BY q.two_category, q.quiz_id
-        """, (attempt_id,)).fetchall()
+        """, (attempt_id,))
+
+        def iter_items(chunk_size: int = 100):
+            """Yield the attempt's responses a chunk at a time while the template renders."""
+            while rows := items_cur.fetchmany(chunk_size):
+                yield from rows
         
-        # Compute this attempt's topic split
-    fund_correct = sum(1 for it in items if it["two_category"] == "Data Modeling & DBMS Fundamentals" and it["score"])
-    fund_total = sum(1 for it in items if it["two_category"] == "Data Modeling & DBMS Fundamentals")
-    norm_correct = sum(1 for it in items if it["two_category"] == "Normalization & Dependencies" and it["score"])
-    norm_total = sum(1 for it in items if it["two_category"] == "Normalization & Dependencies")
+        # Compute this attempt's topic split in SQLite
+        cats = query_nt(conn, """
+            SELECT q.two_category AS cat, SUM(r.score) AS correct, COUNT(*) AS total
+            FROM response r
+            JOIN quiz q ON q.quiz_id = r.quiz_id
+            WHERE r.attempt_id = ?
+            GROUP BY q.two_category
+        """, (attempt_id,)).fetchall()
+        scores_map = {row.cat: (row.correct or 0, row.total) for row in cats}
+
+    fund_correct, fund_total = scores_map.get("Data Modeling & DBMS Fundamentals", (0, 0))
+    norm_correct, norm_total = scores_map.get("Normalization & Dependencies", (0, 0))
 
     fund_pct = round(100.0 * fund_correct / fund_total, 1) if fund_total else 0.0
     norm_pct = round(100.0 * norm_correct / norm_total, 1) if norm_total else 0.0
@@ -522,10 +889,10 @@ def review(attempt_id: int):
     
     next_topic_name = "Database Development Process"
 
-    return render_template(
+    return stream_template(
         "review.html",
         attempt=attempt,
-        items=items,
+        items=iter_items(),
         fund_pct=fund_pct,
         norm_pct=norm_pct,
         unlocked_next=unlocked_next,
@@ -535,67 +902,91 @@ def review(attempt_id: int):
 
 # --- Routes: Dashboard & Unlock ---
 
+# One round-trip for the whole dashboard. Rows are told apart by `tag`:
+#   hist    -> started_at, score_pct               (finished attempts, oldest first)
+#   latest  -> attempt_id, score_pct               (most recently finished attempt)
+#   cat     -> two_category, correct, total        (per-category split of `latest`)
+#   mastery -> lifetime_fund_correct, lifetime_norm_correct
+SQL_STUDENT_DASHBOARD = """
+    WITH latest AS (
+        SELECT attempt_id, score_pct FROM attempt
+        WHERE student_id = :sid AND finished_at IS NOT NULL
+        ORDER BY finished_at DESC LIMIT 1
+    )
+    SELECT * FROM (
+        SELECT 'hist' AS tag, started_at AS a, score_pct AS b, NULL AS c
+        FROM attempt
+        WHERE student_id = :sid AND finished_at IS NOT NULL
+        ORDER BY started_at
+    )
+    UNION ALL
+    SELECT 'latest', attempt_id, score_pct, NULL FROM latest
+    UNION ALL
+    SELECT 'cat', q.two_category, SUM(r.score), COUNT(*)
+    FROM response r
+    JOIN quiz q ON q.quiz_id = r.quiz_id
+    WHERE r.attempt_id = (SELECT attempt_id FROM latest)
+    GROUP BY q.two_category
+    UNION ALL
+    SELECT 'mastery', lifetime_fund_correct, lifetime_norm_correct, NULL
+    FROM student WHERE student_id = :sid
+"""
+
 @app.route("/student/<int:student_id>")
 @student_required
 def student_dashboard(student_id: int):
-    if session.get("student_id") != student_id:
+    if g.student_id != student_id:
         flash("Access denied", "error")
         return redirect(url_for("index"))
     
     with get_db() as conn:
-        # Get attempt history for chart/table
-        attempts = conn.execute(
-            "SELECT started_at, score_pct FROM attempt WHERE student_id = ? AND finished_at IS NOT NULL ORDER BY started_at",
-            (student_id,)
-        ).fetchall()
-        
-        # Get latest finished attempt for top cards
-        latest_attempt = conn.execute(
-            "SELECT attempt_id, score_pct FROM attempt WHERE student_id = ? AND finished_at IS NOT NULL ORDER BY finished_at DESC LIMIT 1",
-            (student_id,)
-        ).fetchone()
-
-        # Get the lifetime mastery status (50/50 points)
-        lifetime_mastery = get_lifetime_mastery(student_id)
+        rows = conn.execute(SQL_STUDENT_DASHBOARD, {"sid": student_id}).fetchall()
+
+    attempts = []
+    latest_attempt = None
+    scores_map = {}
+    fund_total = norm_total = 0
+    for row in rows:
+        tag = row["tag"]
+        if tag == "hist":
+            attempts.append({"started_at": row["a"], "score_pct": row["b"]})
+        elif tag == "cat":
+            scores_map[row["a"]] = {'correct': row["b"], 'total': row["c"]}
+        elif tag == "latest":
+            latest_attempt = {"attempt_id": row["a"], "score_pct": row["b"]}
+        else:
+            fund_total, norm_total = row["a"], row["b"]
+
+    # Get the lifetime mastery status (50/50 points)
+    lifetime_mastery = lifetime_mastery_from_totals(fund_total, norm_total)
+    
+    # Compute unlock status based on *latest attempt*
+    latest_unlocked = False
+    latest_fund_pct = 0.0
+    latest_norm_pct = 0.0
+    
+    if latest_attempt:
+        fund_data = scores_map.get("Data Modeling & DBMS Fundamentals", {'correct': 0, 'total': 0})
+        norm_data = scores_map.get("Normalization & Dependencies", {'correct': 0, 'total': 0})
         
-        # Compute unlock status based on *latest attempt*
-        latest_unlocked = False
-        latest_fund_pct = 0.0
-        latest_norm_pct = 0.0
+        latest_fund_pct = round(100.0 * fund_data['correct'] / fund_data['total'], 1) if fund_data['total'] else 0.0
+        latest_norm_pct = round(100.0 * norm_data['correct'] / norm_data['total'], 1) if norm_data['total'] else 0.0
         
-        if latest_attempt:
-            # Fetch the actual scores for the latest attempt to check 100%
-            scores = conn.execute("""
-                SELECT q.two_category AS cat, SUM(r.score) AS correct, COUNT(*) AS total
-                FROM response r
-                JOIN quiz q ON q.quiz_id = r.quiz_id
-                WHERE r.attempt_id = ?
-                GROUP BY q.two_category
-            """, (latest_attempt['attempt_id'],)).fetchall()
-            
-            scores_map = {row['cat']: {'correct': row['correct'], 'total': row['total']} for row in scores}
-            
-            fund_data = scores_map.get("Data Modeling & DBMS Fundamentals", {'correct': 0, 'total': 0})
-            norm_data = scores_map.get("Normalization & Dependencies", {'correct': 0, 'total': 0})
-            
-            latest_fund_pct = round(100.0 * fund_data['correct'] / fund_data['total'], 1) if fund_data['total'] else 0.0
-            latest_norm_pct = round(100.0 * norm_data['correct'] / norm_data['total'], 1) if norm_data['total'] else 0.0
-            
-            if latest_fund_pct == 100.0 and latest_norm_pct == 100.0:
-                latest_unlocked = True
-
-        return render_template(
-            "student_dashboard.html",
-            latest_attempt=latest_attempt,
-            latest_fund_pct=latest_fund_pct,
-            latest_norm_pct=latest_norm_pct,
-            lifetime_mastery=lifetime_mastery,
-            unlocked_next=latest_unlocked,
-            next_topic_name="Database Development Process",
-            labels=[a["started_at"][:10] for a in attempts],
-            scores=[float(a["score_pct"] or 0) for a in attempts],
-            attempts_history=attempts
-        )
+        if latest_fund_pct == 100.0 and latest_norm_pct == 100.0:
+            latest_unlocked = True
+
+    return render_template(
+        "student_dashboard.html",
+        latest_attempt=latest_attempt,
+        latest_fund_pct=latest_fund_pct,
+        latest_norm_pct=latest_norm_pct,
+        lifetime_mastery=lifetime_mastery,
+        unlocked_next=latest_unlocked,
+        next_topic_name="Database Development Process",
+        labels=[a["started_at"][:10] for a in attempts],
+        scores=[float(a["score_pct"] or 0) for a in attempts],
+        attempts_history=attempts
+    )
 
 # --- Routes: Feedback & Seeding ---
 
@@ -607,82 +998,163 @@ def thanks():
 @app.route("/api/feedback", methods=["POST"])
 @student_required
 def api_feedback():
-    data = request.get_json(silent=True) or {}
+    data = json_body() or {}
     rating = int(data.get("rating") or 0)
     comment = data.get("comment", "")
     
     if rating < 1 or rating > 5:
-        return jsonify({"error": "Invalid rating"}), 400
+        return ojson({"error": "Invalid rating"}), 400
     
     # Store feedback (we are NOT storing feedback as per final user request, only showing success)
-    print(f"[FEEDBACK] sid={session['student_id']} rating={rating} comment_len={len(comment)}")
-    return jsonify({"ok": True})
+    print(f"[FEEDBACK] sid={g.student_id} rating={rating} comment_len={len(comment)}")
+    return ojson({"ok": True})
 
 # --- Routes: Lecturer (Admin) ---
 
-@app.route("/admin")
-@lecturer_required
-def admin_overview():
+# Admin SQL lives at module scope so every request passes the same string
+# objects to the connection's prepared-statement cache.
+SQL_ADMIN_TOTALS = """
+    SELECT
+        (SELECT COUNT(*) FROM student) AS students_total,
+        (SELECT COUNT(*) FROM attempt WHERE finished_at IS NOT NULL) AS attempts_total,
+        (SELECT COUNT(*) FROM response) AS responses_total
+"""
+
+SQL_ADMIN_BY_CATEGORY = """
+    SELECT q.two_category AS cat,
+           ROUND(AVG(r.score)*100,1) AS acc_pct,
+           COUNT(*) AS n_responses
+    FROM response r
+    JOIN quiz q ON q.quiz_id = r.quiz_id
+    GROUP BY q.two_category
+    ORDER BY acc_pct DESC
+"""
+
+SQL_ADMIN_RECENT_ATTEMPTS = """
+    SELECT started_day AS day, COUNT(*) AS n
+    FROM attempt
+    WHERE started_day >= date('now','-14 days') AND finished_at IS NOT NULL
+    GROUP BY started_day
+    ORDER BY day ASC
+"""
+
+SQL_ADMIN_PER_QUESTION = """
+    SELECT q.quiz_id, q.question, q.two_category,
+           ROUND(st.sum_score * 1.0 / st.n * 100, 1) AS accuracy,
+           st.n AS attempts,
+           ROUND(st.sum_time_timed / NULLIF(st.n_timed, 0), 2) AS avg_time,
+           st.n_timed AS timed_attempts
+    FROM quiz_stats st
+    JOIN quiz q ON q.quiz_id = st.quiz_id
+    WHERE st.n > 0
+    ORDER BY q.quiz_id
+"""
+
+SQL_ADMIN_STUDENT_PERFORMANCE = """
+    SELECT s.name, s.email,
+           COUNT(DISTINCT a.attempt_id) AS total_attempts,
+           ROUND(AVG(a.score_pct),1) AS avg_score,
+           MAX(a.score_pct) AS best_score,
+           MIN(a.started_at) AS first_attempt,
+           MAX(a.finished_at) AS last_attempt
+    FROM student s
+    LEFT JOIN attempt a ON s.student_id = a.student_id AND a.finished_at IS NOT NULL
+    GROUP BY s.student_id
+    ORDER BY avg_score DESC, s.student_id
+    LIMIT ? OFFSET ?
+"""
+
+SQL_ADMIN_QUESTION_ANALYTICS = """
+    SELECT q.quiz_id, q.question, q.two_category,
+           st.n AS total_attempts,
+           ROUND(st.sum_score * 1.0 / st.n * 100, 1) AS accuracy,
+           ROUND(st.sum_time / st.n, 2) AS avg_time,
+           st.sum_score AS correct_count
+    FROM quiz_stats st
+    JOIN quiz q ON q.quiz_id = st.quiz_id
+    WHERE st.n > 0
+    ORDER BY accuracy ASC, q.quiz_id
+    LIMIT ? OFFSET ?
+"""
+
+SQL_ADMIN_RANKINGS = """
+    WITH latest AS (
+        SELECT student_id, score_pct, finished_at,
+               ROW_NUMBER() OVER (PARTITION BY student_id ORDER BY attempt_id DESC) AS rn
+        FROM attempt
+        WHERE finished_at IS NOT NULL
+    )
+    SELECT s.name, s.email,
+           l.score_pct,
+           l.finished_at,
+           ROW_NUMBER() OVER (ORDER BY l.score_pct DESC, l.finished_at ASC) as rank
+    FROM latest l
+    JOIN student s ON s.student_id = l.student_id
+    WHERE l.rn = 1
+    ORDER BY l.score_pct DESC, l.finished_at ASC
+"""
+
+SQL_ADMIN_QUESTIONS = """
+    SELECT q.quiz_id, q.question, q.two_category, q.explanation,
+           COALESCE(st.n, 0) AS total_responses,
+           ROUND(st.sum_score * 1.0 / NULLIF(st.n, 0) * 100, 1) AS accuracy,
+           ROUND(st.sum_time / NULLIF(st.n, 0), 2) AS avg_time
+    FROM quiz q
+    LEFT JOIN quiz_stats st ON st.quiz_id = q.quiz_id
+    ORDER BY q.two_category, q.quiz_id
+"""
+
+SQL_ADMIN_STUDENTS = """
+    SELECT s.student_id, s.name, s.email,
+           COUNT(DISTINCT a.attempt_id) AS total_attempts,
+           ROUND(AVG(a.score_pct),1) AS avg_score,
+           MAX(a.score_pct) AS best_score,
+           MAX(a.finished_at) AS last_attempt
+    FROM student s
+    LEFT JOIN attempt a ON s.student_id = a.student_id AND a.finished_at IS NOT NULL
+    GROUP BY s.student_id
+    ORDER BY s.name
+"""
+
+ADMIN_CACHE_TTL_S = 30
+ADMIN_PAGE_SIZE = 50
+
+@lru_cache(maxsize=1)
+def _admin_overview_payload(bucket: int) -> Dict[str, Any]:
+    # bucket = current TTL window; a new window misses and recomputes
     with get_db() as conn:
         # Get overview statistics
-        totals = conn.execute("""
-            SELECT
-              (SELECT COUNT(*) FROM student) AS students_total,
-                (SELECT COUNT(*) FROM attempt WHERE finished_at IS NOT NULL) AS attempts_total,
-                (SELECT COUNT(*) FROM response) AS responses_total
-        """).fetchone()
+        totals = query_nt(conn, SQL_ADMIN_TOTALS).fetchone()
         
         # Get category performance
-        by_category = conn.execute("""
-            SELECT q.two_category AS cat,
-                   ROUND(AVG(r.score)*100,1) AS acc_pct,
-                   COUNT(*) AS n_responses
-            FROM response r
-            JOIN quiz q ON q.quiz_id = r.quiz_id
-            GROUP BY q.two_category
-            ORDER BY acc_pct DESC
-        """).fetchall()
+        by_category = query_nt(conn, SQL_ADMIN_BY_CATEGORY).fetchall()
 
         # Get 14-day activity chart (finished attempts only)
-        recent_attempts = conn.execute("""
-            SELECT substr(started_at,1,10) AS day, COUNT(*) AS n
-            FROM attempt
-            WHERE started_at >= date('now','-14 days') AND finished_at IS NOT NULL
-            GROUP BY substr(started_at,1,10)
-            ORDER BY day ASC
-        """).fetchall()
+        recent_attempts = query_nt(conn, SQL_ADMIN_RECENT_ATTEMPTS).fetchall()
+        
+        # Per-question accuracy and timing from the running totals; hardest/slowest top 5 are picked below
+        per_question = query_nt(conn, SQL_ADMIN_PER_QUESTION).fetchall()
         
         # Get top 5 hardest questions
-        hardest_questions = conn.execute("""
-            SELECT q.quiz_id, q.question, q.two_category,
-                   ROUND(AVG(r.score)*100,1) AS accuracy,
-                   COUNT(*) AS attempts
-            FROM response r
-            JOIN quiz q ON q.quiz_id = r.quiz_id
-            GROUP BY q.quiz_id
-            ORDER BY accuracy ASC
-            LIMIT 5
-        """).fetchall()
+        hardest_questions = [
+            {"quiz_id": r.quiz_id, "question": r.question, "two_category": r.two_category,
+             "accuracy": r.accuracy, "attempts": r.attempts}
+            for r in sorted(per_question, key=lambda r: r.accuracy)[:5]
+        ]
         
-        # Get top 5 slowest questions
-        slowest_questions = conn.execute("""
-            SELECT q.quiz_id, q.question, q.two_category,
-                   ROUND(AVG(r.response_time_s),2) AS avg_time,
-                   COUNT(*) AS attempts
-            FROM response r
-            JOIN quiz q ON q.quiz_id = r.quiz_id
-            WHERE r.response_time_s > 0
-            GROUP BY q.quiz_id
-            ORDER BY avg_time DESC
-            LIMIT 5
-        """).fetchall()
+        # Get top 5 slowest questions (only responses with a recorded time)
+        slowest_questions = [
+            {"quiz_id": r.quiz_id, "question": r.question, "two_category": r.two_category,
+             "avg_time": r.avg_time, "attempts": r.timed_attempts}
+            for r in sorted((r for r in per_question if r.avg_time is not None),
+                            key=lambda r: -r.avg_time)[:5]
+        ]
         
         # Prepare chart data
-        chart_labels = [row["day"] for row in recent_attempts]
-        chart_counts = [row["n"] for row in recent_attempts]
+        chart_labels = [row.day for row in recent_attempts]
+        chart_counts = [row.n for row in recent_attempts]
         
-        return render_template(
-            "admin_overview.html",
+        return dict(
             totals=totals,
             by_category=by_category,
             chart_labels=chart_labels,
@@ -691,40 +1163,31 @@ def admin_overview():
             slowest_questions=slowest_questions
         )
 
+@app.route("/admin")
+@lecturer_required
+def admin_overview():
+    payload = _admin_overview_payload(int(time.time() // ADMIN_CACHE_TTL_S))
+    return render_template("admin_overview.html", **payload)
+
 @app.route("/admin/analytics")
 @lecturer_required
 def admin_analytics():
+    page = max(request.args.get("page", 0, type=int), 0)
+    # One extra row per query tells us whether a next page exists
+    window = (ADMIN_PAGE_SIZE + 1, page * ADMIN_PAGE_SIZE)
     with get_db() as conn:
         # Get detailed analytics
-        student_performance = conn.execute("""
-            SELECT s.name, s.email,
-                   COUNT(DISTINCT a.attempt_id) AS total_attempts,
-                   ROUND(AVG(a.score_pct),1) AS avg_score,
-                   MAX(a.score_pct) AS best_score,
-                   MIN(a.started_at) AS first_attempt,
-                   MAX(a.finished_at) AS last_attempt
-            FROM student s
-            LEFT JOIN attempt a ON s.student_id = a.student_id AND a.finished_at IS NOT NULL
-            GROUP BY s.student_id
-            ORDER BY avg_score DESC
-        """).fetchall()
+        student_performance = query_nt(conn, SQL_ADMIN_STUDENT_PERFORMANCE, window).fetchall()
         
-        question_analytics = conn.execute("""
-            SELECT q.quiz_id, q.question, q.two_category,
-                   COUNT(*) AS total_attempts,
-                   ROUND(AVG(r.score)*100,1) AS accuracy,
-                   ROUND(AVG(r.response_time_s),2) AS avg_time,
-                   SUM(r.score) AS correct_count
-            FROM response r
-            JOIN quiz q ON q.quiz_id = r.quiz_id
-            GROUP BY q.quiz_id
-            ORDER BY accuracy ASC
-        """).fetchall()
+        question_analytics = query_nt(conn, SQL_ADMIN_QUESTION_ANALYTICS, window).fetchall()
 
+    has_next = len(student_performance) > ADMIN_PAGE_SIZE or len(question_analytics) > ADMIN_PAGE_SIZE
     return render_template(
         "admin_analytics.html",
-            student_performance=student_performance,
-            question_analytics=question_analytics
+            student_performance=student_performance[:ADMIN_PAGE_SIZE],
+            question_analytics=question_analytics[:ADMIN_PAGE_SIZE],
+            page=page,
+            has_next=has_next
         )
 
 @app.route("/admin/rankings")
@@ -732,22 +1195,7 @@ def admin_analytics():
 def admin_rankings():
     with get_db() as conn:
         # Get student rankings based on latest attempt scores
-        rankings = conn.execute("""
-            SELECT s.name, s.email,
-                   a.score_pct,
-                   a.finished_at,
-                   ROW_NUMBER() OVER (ORDER BY a.score_pct DESC, a.finished_at ASC) as rank
-            FROM student s
-            JOIN attempt a ON s.student_id = a.student_id
-            WHERE a.finished_at IS NOT NULL
-            AND a.attempt_id = (
-                SELECT MAX(attempt_id) 
-                        FROM attempt a2
-                WHERE a2.student_id = s.student_id 
-                AND a2.finished_at IS NOT NULL
-            )
-            ORDER BY a.score_pct DESC, a.finished_at ASC
-        """).fetchall()
+        rankings = query_nt(conn, SQL_ADMIN_RANKINGS).fetchall()
         
         return render_template("admin_rankings.html", rankings=rankings)
 
@@ -755,16 +1203,7 @@ def admin_rankings():
 @lecturer_required
 def admin_questions():
     with get_db() as conn:
-        questions = conn.execute("""
-            SELECT q.quiz_id, q.question, q.two_category, q.explanation,
-                   COUNT(r.response_id) AS total_responses,
-                   ROUND(AVG(r.score)*100,1) AS accuracy,
-                   ROUND(AVG(r.response_time_s),2) AS avg_time
-            FROM quiz q
-            LEFT JOIN response r ON q.quiz_id = r.quiz_id
-            GROUP BY q.quiz_id
-            ORDER BY q.two_category, q.quiz_id
-        """).fetchall()
+        questions = query_nt(conn, SQL_ADMIN_QUESTIONS).fetchall()
         
         return render_template("admin_questions.html", questions=questions)
 
@@ -772,17 +1211,7 @@ def admin_questions():
 @lecturer_required
 def admin_students():
     with get_db() as conn:
-        students = conn.execute("""
-            SELECT s.student_id, s.name, s.email,
-                   COUNT(DISTINCT a.attempt_id) AS total_attempts,
-                   ROUND(AVG(a.score_pct),1) AS avg_score,
-                   MAX(a.score_pct) AS best_score,
-                   MAX(a.finished_at) AS last_attempt
-            FROM student s
-            LEFT JOIN attempt a ON s.student_id = a.student_id AND a.finished_at IS NOT NULL
-            GROUP BY s.student_id
-            ORDER BY s.name
-        """).fetchall()
+        students = query_nt(conn, SQL_ADMIN_STUDENTS).fetchall()
         
     return render_template("admin_students.html", students=students)
 
@@ -8,6 +8,7 @@ import os
 import json
 import sqlite3
 import random
+import queue
 from datetime import datetime
 from functools import wraps
 from typing import Any, Dict, List, Optional
@@ -18,22 +19,66 @@ from flask import (
 )
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # optional speedup; jsonify is used otherwise
+    orjson = None
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import Argon2Error
+except ImportError:  # fall back to werkzeug hashes
+    PasswordHasher = None
+    Argon2Error = Exception
+
+try:
+    from flask_compress import Compress
+except ImportError:  # optional; responses go out uncompressed otherwise
+    Compress = None
+
 # --- Configuration & Setup ---
 load_dotenv()
 app = Flask(__name__, static_folder="static", template_folder="templates")
 app.secret_key = os.environ.get("FLASK_SECRET", "dev-secret-plai")
 app.config["JSON_SORT_KEYS"] = False
+# gzip/br for responses over COMPRESS_MIN_SIZE (500 B), e.g. the quiz payload
+if Compress is not None:
+    Compress(app)
 
 # Database configuration
 DB_PATH = os.environ.get("PLA_DB", os.path.join(os.path.dirname(__file__), "pla.db"))
 
+# WAL lets readers run alongside a writer; set SQLITE_WAL=0 on network filesystems.
+# journal_mode persists in the file, the rest must be re-issued per connection.
+SQLITE_PRAGMAS = f"""
+PRAGMA journal_mode={'WAL' if os.environ.get('SQLITE_WAL', '1') != '0' else 'DELETE'};
+PRAGMA synchronous=NORMAL;
+PRAGMA cache_size=-20000;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+PRAGMA busy_timeout=5000;
+PRAGMA foreign_keys=ON;
+"""
+
 # --- Database Helper ---
+POOL_SIZE = 8
+# Idle connections kept warm across requests; LIFO hands out the most recently used one
+_POOL: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=POOL_SIZE)
+
+def _make_conn() -> sqlite3.Connection:
+    """Open a connection with row_factory and PRAGMAs applied once."""
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SQLITE_PRAGMAS)
+    return conn
+
 def get_db():
-    """Get database connection with proper configuration."""
+    """Get a pooled database connection for this request."""
     if 'db' not in g:
-        g.db = sqlite3.connect(DB_PATH)
-        g.db.row_factory = sqlite3.Row
-        g.db.execute("PRAGMA foreign_keys=ON")
+        try:
+            g.db = _POOL.get_nowait()
+        except queue.Empty:
+            g.db = _make_conn()
     return g.db
 
 def is_db_ready() -> bool:
@@ -55,41 +100,176 @@ def is_db_ready() -> bool:
     except Exception:
         return False
 
+# Hot-path indexes, also in schema.sql; created here for databases seeded before they existed
+INDEX_DDL = {
+    'idx_response_attempt': "CREATE INDEX IF NOT EXISTS idx_response_attempt ON response(attempt_id)",
+    'idx_response_student_quiz': "CREATE INDEX IF NOT EXISTS idx_response_student_quiz ON response(student_id, quiz_id)",
+    'idx_attempt_student_finished': "CREATE INDEX IF NOT EXISTS idx_attempt_student_finished ON attempt(student_id, finished_at DESC)",
+    'idx_quiz_category': "CREATE INDEX IF NOT EXISTS idx_quiz_category ON quiz(two_category)",
+}
+def ensure_indexes(conn):
+    """Create any missing hot-path indexes and refresh planner stats."""
+    existing = {r['name'] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    missing = [ddl for name, ddl in INDEX_DDL.items() if name not in existing]
+    for ddl in missing:
+        conn.execute(ddl)
+    if missing:
+        conn.execute("ANALYZE")
+        conn.commit()
+
+# Admin summaries kept current by triggers, so every writer (routes and seed
+# scripts alike) updates them inside its own transaction.
+_STUDENT_SUMMARY_REFRESH = """
+    INSERT INTO student_summary (student_id, attempt_count, avg_score, best_score, last_score)
+    SELECT {sid}, COUNT(*), AVG(score_pct), MAX(score_pct),
+           (SELECT score_pct FROM attempt WHERE student_id = {sid} AND finished_at IS NOT NULL
+            ORDER BY finished_at DESC, attempt_id DESC LIMIT 1)
+    FROM attempt WHERE student_id = {sid} AND finished_at IS NOT NULL
+    ON CONFLICT(student_id) DO UPDATE SET
+        attempt_count = excluded.attempt_count, avg_score = excluded.avg_score,
+        best_score = excluded.best_score, last_score = excluded.last_score;
+"""
+SUMMARY_DDL = f"""
+CREATE TABLE IF NOT EXISTS student_summary (
+    student_id INTEGER PRIMARY KEY, attempt_count INTEGER NOT NULL DEFAULT 0,
+    avg_score REAL, best_score REAL, last_score REAL
+);
+CREATE TABLE IF NOT EXISTS question_summary (
+    quiz_id INTEGER PRIMARY KEY, correct_sum INTEGER NOT NULL DEFAULT 0,
+    response_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TRIGGER IF NOT EXISTS trg_student_summary_ins AFTER INSERT ON attempt
+WHEN NEW.finished_at IS NOT NULL BEGIN
+    {_STUDENT_SUMMARY_REFRESH.format(sid='NEW.student_id')}
+END;
+CREATE TRIGGER IF NOT EXISTS trg_student_summary_upd AFTER UPDATE OF student_id, finished_at, score_pct ON attempt BEGIN
+    {_STUDENT_SUMMARY_REFRESH.format(sid='NEW.student_id')}
+    {_STUDENT_SUMMARY_REFRESH.format(sid='OLD.student_id')}
+END;
+CREATE TRIGGER IF NOT EXISTS trg_student_summary_del AFTER DELETE ON attempt BEGIN
+    {_STUDENT_SUMMARY_REFRESH.format(sid='OLD.student_id')}
+END;
+CREATE TRIGGER IF NOT EXISTS trg_question_summary_ins AFTER INSERT ON response BEGIN
+    INSERT INTO question_summary (quiz_id, correct_sum, response_count)
+    VALUES (NEW.quiz_id, NEW.is_correct, 1)
+    ON CONFLICT(quiz_id) DO UPDATE SET
+        correct_sum = correct_sum + excluded.correct_sum,
+        response_count = response_count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_question_summary_del AFTER DELETE ON response BEGIN
+    UPDATE question_summary
+    SET correct_sum = correct_sum - OLD.is_correct, response_count = response_count - 1
+    WHERE quiz_id = OLD.quiz_id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_question_summary_upd AFTER UPDATE OF quiz_id, is_correct ON response BEGIN
+    UPDATE question_summary
+    SET correct_sum = correct_sum - OLD.is_correct, response_count = response_count - 1
+    WHERE quiz_id = OLD.quiz_id;
+    INSERT INTO question_summary (quiz_id, correct_sum, response_count)
+    VALUES (NEW.quiz_id, NEW.is_correct, 1)
+    ON CONFLICT(quiz_id) DO UPDATE SET
+        correct_sum = correct_sum + excluded.correct_sum,
+        response_count = response_count + 1;
+END;
+"""
+SUMMARY_BACKFILL = """
+INSERT OR REPLACE INTO student_summary (student_id, attempt_count, avg_score, best_score, last_score)
+SELECT a.student_id, COUNT(*), AVG(a.score_pct), MAX(a.score_pct),
+       (SELECT l.score_pct FROM attempt l WHERE l.student_id = a.student_id AND l.finished_at IS NOT NULL
+        ORDER BY l.finished_at DESC, l.attempt_id DESC LIMIT 1)
+FROM attempt a WHERE a.finished_at IS NOT NULL GROUP BY a.student_id;
+INSERT OR REPLACE INTO question_summary (quiz_id, correct_sum, response_count)
+SELECT quiz_id, SUM(is_correct), COUNT(*) FROM response GROUP BY quiz_id;
+"""
+def ensure_summaries(conn):
+    """Create the admin summary tables and triggers, backfilling them on first creation."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='student_summary'"
+    ).fetchone()
+    if not exists:
+        # Triggers and backfill land together so no write is counted twice or missed
+        conn.executescript("BEGIN IMMEDIATE;" + SUMMARY_DDL + SUMMARY_BACKFILL + "COMMIT;")
+
 @app.teardown_appcontext
 def close_db(error):
-    """Close database connection."""
+    """Return the database connection to the pool (closing it if the pool is full)."""
     db = g.pop('db', None)
     if db is not None:
-        db.close()
+        db.rollback()
+        try:
+            _POOL.put_nowait(db)
+        except queue.Full:
+            db.close()
+
+# --- Password Hashing ---
+# Argon2id with an explicit cost; tune time_cost so a verify takes ~50 ms on the
+# deployment host. werkzeug hashes are still accepted and upgraded on the next login.
+PH = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=1) if PasswordHasher else None
+
+def hash_password(password: str) -> str:
+    """Hash a password, preferring Argon2id when argon2-cffi is installed."""
+    if PH is not None:
+        return PH.hash(password)
+    return generate_password_hash(password)
+
+def verify_password(pwhash: str, password: str) -> bool:
+    """Check a password against an Argon2 or legacy werkzeug hash."""
+    if pwhash.startswith('$argon2'):
+        if PH is None:
+            return False
+        try:
+            return PH.verify(pwhash, password)
+        except Argon2Error:
+            return False
+    return check_password_hash(pwhash, password)
+
+def password_needs_rehash(pwhash: str) -> bool:
+    """True when a stored hash should be upgraded to the current Argon2 settings."""
+    if PH is None:
+        return False
+    if not pwhash.startswith('$argon2'):
+        return True
+    return PH.check_needs_rehash(pwhash)
+
+def upgrade_password_hash(conn, role: str, account_id: int, pwhash: str, password: str):
+    """Re-hash a verified password if its stored hash is outdated."""
+    if password_needs_rehash(pwhash):
+        conn.execute(
+            f"UPDATE {role} SET password_hash = ? WHERE {role}_id = ?",
+            (hash_password(password), account_id)
+        )
+        conn.commit()
+
+# Verified when no account matches, so unknown emails cost the same as wrong passwords
+_DUMMY_HASH = hash_password('not-a-real-password')
 
 # --- Startup Guard ---
+# Set once the database has passed the readiness check; never re-checked in this process
+_DB_READY = False
+
 @app.before_request
 def startup_guard():
-    """Verify database is ready before first request."""
-    if hasattr(g, 'db_checked'):
+    """Verify database is ready before the first request this process serves."""
+    global _DB_READY
+    if _DB_READY:
         return
-    g.db_checked = True
     
     try:
         conn = get_db()
         
-        # Use simplified database readiness check
+        # Required tables and a full quiz bank (is_db_ready covers both)
         if not is_db_ready():
             raise Exception("Database not ready")
         
-        # Check required tables
-        required_tables = ['student', 'lecturer', 'quiz', 'attempt', 'response', 'feedback']
-        tables = conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
-        table_names = [t['name'] for t in tables]
-        
-        missing_tables = [t for t in required_tables if t not in table_names]
-        if missing_tables:
-            raise Exception(f"Missing required tables: {missing_tables}")
+        ensure_indexes(conn)
+        ensure_summaries(conn)
             
     except Exception as e:
         # Render db_not_ready.html with repair command
         return render_template('db_not_ready.html', error=str(e), 
                              repair_command="python scripts/reset_and_seed_17.py --with-attempts")
+    
+    _DB_READY = True
 
 # --- Authentication Decorators ---
 def login_required(f):
@@ -119,6 +299,98 @@ def lecturer_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# --- Scoring Helpers ---
+def topic_percentages(conn, attempt_id):
+    """Return (fund_pct, norm_pct) for an attempt, aggregated by SQLite in one scan."""
+    totals = {r['two_category']: (r['correct'], r['total']) for r in conn.execute("""
+        SELECT q.two_category, SUM(r.is_correct) AS correct, COUNT(*) AS total
+        FROM response r
+        JOIN quiz q ON r.quiz_id = q.quiz_id
+        WHERE r.attempt_id = ?
+        GROUP BY q.two_category
+    """, (attempt_id,))}
+    
+    fund_correct, fund_total = totals.get('Data Modeling & DBMS Fundamentals', (0, 0))
+    norm_correct, norm_total = totals.get('Normalization & Dependencies', (0, 0))
+    
+    fund_pct = round((fund_correct / fund_total * 100), 1) if fund_total > 0 else 0
+    norm_pct = round((norm_correct / norm_total * 100), 1) if norm_total > 0 else 0
+    return fund_pct, norm_pct
+
+def score_answers(answers, answer_key, attempt_id, student_id):
+    """Score submitted answers; return (correct_count, response rows ready for executemany)."""
+    correct_count = 0
+    rows = []
+    append = rows.append
+    lookup = answer_key.get
+    
+    for answer in answers:
+        get = answer.get
+        quiz_id = get('quiz_id')
+        correct_text = lookup(quiz_id)
+        if correct_text is None:
+            continue
+        
+        answer_text = get('answer_text', '')
+        is_correct = int(answer_text == correct_text)
+        correct_count += is_correct
+        append((attempt_id, student_id, quiz_id, get('answer_letter', ''),
+                answer_text, is_correct, get('response_time', 0)))
+    
+    return correct_count, rows
+
+# --- JSON Helper ---
+def ojson(obj):
+    """JSON response serialized with orjson when available."""
+    if orjson is None:
+        return jsonify(obj)
+    return app.response_class(orjson.dumps(obj), mimetype="application/json")
+
+# --- Quiz Bank Cache ---
+# The bank is ~30 rows that only change on reseed, so it is read once per process
+# with options already parsed. The bank version lives in the database header
+# (PRAGMA user_version), so invalidate_quiz_cache() reaches every worker process.
+_QUIZ_CACHE: Optional[List[Dict[str, Any]]] = None
+OPTION_LETTERS = 'ABCDEFGH'
+_ANSWER_KEY: Dict[int, str] = {}
+_quiz_cache_version = -1
+
+def quiz_bank_version() -> int:
+    """Return the shared quiz bank version (a header read, no table access)."""
+    return get_db().execute("PRAGMA user_version").fetchone()[0]
+
+def get_quiz_cache() -> List[Dict[str, Any]]:
+    """Return the cached quiz bank, reloading it when the shared version moves."""
+    global _QUIZ_CACHE, _ANSWER_KEY, _quiz_cache_version
+    version = quiz_bank_version()
+    if _QUIZ_CACHE is None or _quiz_cache_version != version:
+        rows = get_db().execute("""
+            SELECT quiz_id, question, options_json, correct_text, two_category, explanation
+            FROM quiz
+        """).fetchall()
+        _ANSWER_KEY = {r['quiz_id']: r['correct_text'] for r in rows}
+        # 'options' holds the parsed tuple; requests swap in a shuffled letter map
+        _QUIZ_CACHE = [{
+            'quiz_id': r['quiz_id'],
+            'question': r['question'],
+            'two_category': r['two_category'],
+            'options': tuple(json.loads(r['options_json'])),
+            'explanation': r['explanation']
+        } for r in rows]
+        _quiz_cache_version = version
+    return _QUIZ_CACHE
+
+def get_answer_key() -> Dict[int, str]:
+    """Return the quiz_id -> correct_text map used for scoring."""
+    get_quiz_cache()
+    return _ANSWER_KEY
+
+def invalidate_quiz_cache() -> int:
+    """Bump the shared quiz bank version so every worker reloads on next use."""
+    version = quiz_bank_version() + 1
+    get_db().execute(f"PRAGMA user_version = {version:d}")
+    return version
+
 # --- Routes ---
 @app.route('/')
 def index():
@@ -138,29 +410,30 @@ def login():
         
         conn = get_db()
         
-        # Check lecturer first
-        lecturer = conn.execute(
-            "SELECT lecturer_id, name, password_hash FROM lecturer WHERE email = ?",
-            (email,)
-        ).fetchone()
+        # Lecturer first, then student, in one lookup
+        accounts = conn.execute("""
+            SELECT 'lecturer' AS role, lecturer_id AS id, name, password_hash FROM lecturer WHERE email = ?
+            UNION ALL
+            SELECT 'student' AS role, student_id AS id, name, password_hash FROM student WHERE email = ?
+        """, (email, email)).fetchall()
         
-        if lecturer and check_password_hash(lecturer['password_hash'], password):
-            session['user_id'] = lecturer['lecturer_id']
-            session['role'] = 'lecturer'
-            session['name'] = lecturer['name']
-            return redirect(url_for('admin'))
+        # Always run at least one verification so response time does not reveal
+        # whether the email is registered
+        if not accounts:
+            verify_password(_DUMMY_HASH, password)
         
-        # Check student
-        student = conn.execute(
-            "SELECT student_id, name, password_hash FROM student WHERE email = ?",
-            (email,)
-        ).fetchone()
-        
-        if student and check_password_hash(student['password_hash'], password):
-            session['user_id'] = student['student_id']
-            session['role'] = 'student'
-            session['name'] = student['name']
-            return redirect(url_for('student_dashboard', student_id=student['student_id']))
+        for account in accounts:
+            if not verify_password(account['password_hash'], password):
+                continue
+            
+            upgrade_password_hash(conn, account['role'], account['id'],
+                                  account['password_hash'], password)
+            session['user_id'] = account['id']
+            session['role'] = account['role']
+            session['name'] = account['name']
+            if account['role'] == 'lecturer':
+                return redirect(url_for('admin'))
+            return redirect(url_for('student_dashboard', student_id=account['id']))
         
         flash('Invalid email or password', 'error')
     
@@ -184,24 +457,19 @@ def register():
         
         conn = get_db()
         
-        # Check if email already exists
-        existing = conn.execute(
-            "SELECT student_id FROM student WHERE email = ?",
-            (email,)
-        ).fetchone()
+        # Create student; the UNIQUE(email) constraint decides duplicates atomically
+        password_hash = hash_password(password)
+        created = conn.execute(
+            """INSERT INTO student (name, email, password_hash, program) VALUES (?, ?, ?, ?)
+               ON CONFLICT(email) DO NOTHING""",
+            (name, email, password_hash, 'BIT')
+        ).rowcount
+        conn.commit()
         
-        if existing:
+        if not created:
             flash('Email already registered', 'error')
             return render_template('register.html')
         
-        # Create student
-        password_hash = generate_password_hash(password)
-        conn.execute(
-            "INSERT INTO student (name, email, password_hash, program) VALUES (?, ?, ?, ?)",
-            (name, email, password_hash, 'BIT')
-        )
-        conn.commit()
-        
         flash('Registration successful! Please login.', 'success')
         return redirect(url_for('login'))
     
@@ -242,20 +510,7 @@ def student_dashboard(student_id):
                              scores=[])
     
     # Calculate topic percentages for latest attempt
-    responses = conn.execute("""
-        SELECT r.is_correct, q.two_category
-        FROM response r
-        JOIN quiz q ON r.quiz_id = q.quiz_id
-        WHERE r.attempt_id = ?
-    """, (latest_attempt['attempt_id'],)).fetchall()
-    
-    fund_correct = sum(1 for r in responses if r['is_correct'] and r['two_category'] == 'Data Modeling & DBMS Fundamentals')
-    fund_total = sum(1 for r in responses if r['two_category'] == 'Data Modeling & DBMS Fundamentals')
-    norm_correct = sum(1 for r in responses if r['is_correct'] and r['two_category'] == 'Normalization & Dependencies')
-    norm_total = sum(1 for r in responses if r['two_category'] == 'Normalization & Dependencies')
-    
-    fund_pct = round((fund_correct / fund_total * 100), 1) if fund_total > 0 else 0
-    norm_pct = round((norm_correct / norm_total * 100), 1) if norm_total > 0 else 0
+    fund_pct, norm_pct = topic_percentages(conn, latest_attempt['attempt_id'])
     
     # Check if unlocked (both topics 100%)
     unlocked = fund_pct == 100.0 and norm_pct == 100.0
@@ -313,33 +568,19 @@ def quiz():
 @student_required
 def api_quiz_progressive():
     """Get 30 questions in random order with shuffled options."""
-    conn = get_db()
-    
-    # Get all 30 questions
-    questions = conn.execute("""
-        SELECT quiz_id, question, options_json, correct_text, two_category, explanation
-        FROM quiz
-        ORDER BY RANDOM()
-    """).fetchall()
+    questions = get_quiz_cache()
     
     result = []
-    for q in questions:
-        # Parse options and shuffle them
-        options = json.loads(q['options_json'])
+    for q in random.sample(questions, len(questions)):
+        # Shuffle a copy of the cached options and map them to letters
+        options = list(q['options'])
         random.shuffle(options)
         
-        # Map options to letters
-        option_map = {chr(65 + i): options[i] for i in range(len(options))}
-        
-        result.append({
-            'quiz_id': q['quiz_id'],
-            'question': q['question'],
-            'two_category': q['two_category'],
-            'options': option_map,
-            'explanation': q['explanation']
-        })
-    
-    return jsonify({
+        item = q.copy()
+        item['options'] = dict(zip(OPTION_LETTERS, options))
+        result.append(item)
+    
+    return ojson({
         'attempt_id': request.args.get('attempt_id'),
         'questions': result
     })
@@ -353,7 +594,7 @@ def submit_quiz():
     answers = data.get('answers', [])
     
     if not attempt_id or not answers:
-        return jsonify({'error': 'Missing attempt_id or answers'}), 400
+        return ojson({'error': 'Missing attempt_id or answers'}), 400
     
     conn = get_db()
     
@@ -363,67 +604,32 @@ def submit_quiz():
     """, (attempt_id, session['user_id'])).fetchone()
     
     if not attempt:
-        return jsonify({'error': 'Invalid attempt'}), 400
+        return ojson({'error': 'Invalid attempt'}), 400
     
-    # Process each answer
-    correct_count = 0
+    # Unknown quiz_ids are skipped but still count toward the total
+    correct_count, rows = score_answers(answers, get_answer_key(), attempt_id, session['user_id'])
     total_count = len(answers)
+    score_pct = round((correct_count / total_count * 100), 1) if total_count > 0 else 0
     
-    for answer in answers:
-        quiz_id = answer.get('quiz_id')
-        answer_letter = answer.get('answer_letter', '')
-        answer_text = answer.get('answer_text', '')
-        response_time = answer.get('response_time', 0)
-        
-        # Get correct answer from database
-        quiz = conn.execute("""
-            SELECT correct_text, two_category FROM quiz WHERE quiz_id = ?
-        """, (quiz_id,)).fetchone()
-        
-        if not quiz:
-            continue
-        
-        # Check if correct
-        is_correct = 1 if answer_text == quiz['correct_text'] else 0
-        if is_correct:
-            correct_count += 1
-        
-        # Store response
-        conn.execute("""
+    # Store responses and close the attempt in a single transaction
+    with conn:
+        conn.executemany("""
             INSERT INTO response (attempt_id, student_id, quiz_id, answer_letter, answer_text, is_correct, response_time_s)
             VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (attempt_id, session['user_id'], quiz_id, answer_letter, answer_text, is_correct, response_time))
-    
-    # Update attempt
-    score_pct = round((correct_count / total_count * 100), 1) if total_count > 0 else 0
-    conn.execute("""
-        UPDATE attempt 
-        SET finished_at = datetime('now'), items_total = ?, items_correct = ?, score_pct = ?
-        WHERE attempt_id = ?
-    """, (total_count, correct_count, score_pct, attempt_id))
-    
-    conn.commit()
+        """, rows)
+        conn.execute("""
+            UPDATE attempt 
+            SET finished_at = datetime('now'), items_total = ?, items_correct = ?, score_pct = ?
+            WHERE attempt_id = ?
+        """, (total_count, correct_count, score_pct, attempt_id))
     
     # Calculate topic percentages
-    responses = conn.execute("""
-        SELECT r.is_correct, q.two_category
-        FROM response r
-        JOIN quiz q ON r.quiz_id = q.quiz_id
-        WHERE r.attempt_id = ?
-    """, (attempt_id,)).fetchall()
-    
-    fund_correct = sum(1 for r in responses if r['is_correct'] and r['two_category'] == 'Data Modeling & DBMS Fundamentals')
-    fund_total = sum(1 for r in responses if r['two_category'] == 'Data Modeling & DBMS Fundamentals')
-    norm_correct = sum(1 for r in responses if r['is_correct'] and r['two_category'] == 'Normalization & Dependencies')
-    norm_total = sum(1 for r in responses if r['two_category'] == 'Normalization & Dependencies')
-    
-    fund_pct = round((fund_correct / fund_total * 100), 1) if fund_total > 0 else 0
-    norm_pct = round((norm_correct / norm_total * 100), 1) if norm_total > 0 else 0
+    fund_pct, norm_pct = topic_percentages(conn, attempt_id)
     
     # Check if unlocked
     unlocked = fund_pct == 100.0 and norm_pct == 100.0
     
-    return jsonify({
+    return ojson({
         'attempt_id': attempt_id,
         'score_pct': score_pct,
         'fund_pct': fund_pct,
@@ -456,13 +662,7 @@ def review(attempt_id):
     """, (attempt_id,)).fetchall()
     
     # Calculate topic percentages
-    fund_correct = sum(1 for r in responses if r['is_correct'] and r['two_category'] == 'Data Modeling & DBMS Fundamentals')
-    fund_total = sum(1 for r in responses if r['two_category'] == 'Data Modeling & DBMS Fundamentals')
-    norm_correct = sum(1 for r in responses if r['is_correct'] and r['two_category'] == 'Normalization & Dependencies')
-    norm_total = sum(1 for r in responses if r['two_category'] == 'Normalization & Dependencies')
-    
-    fund_pct = round((fund_correct / fund_total * 100), 1) if fund_total > 0 else 0
-    norm_pct = round((norm_correct / norm_total * 100), 1) if norm_total > 0 else 0
+    fund_pct, norm_pct = topic_percentages(conn, attempt_id)
     
     # Check if unlocked
     unlocked = fund_pct == 100.0 and norm_pct == 100.0
@@ -489,10 +689,10 @@ def api_feedback():
     comment = data.get('comment', '')
     
     if not rating or rating < 1 or rating > 5:
-        return jsonify({'error': 'Invalid rating'}), 400
+        return ojson({'error': 'Invalid rating'}), 400
     
     # Just return success - not storing feedback as per requirements
-    return jsonify({'message': 'Feedback submitted successfully'})
+    return ojson({'message': 'Feedback submitted successfully'})
 
 # --- Lecturer Routes ---
 @app.route('/admin')
@@ -501,10 +701,12 @@ def admin():
     """Lecturer admin dashboard."""
     conn = get_db()
     
-    # Get basic stats
-    student_count = conn.execute("SELECT COUNT(*) FROM student").fetchone()[0]
-    attempt_count = conn.execute("SELECT COUNT(*) FROM attempt").fetchone()[0]
-    response_count = conn.execute("SELECT COUNT(*) FROM response").fetchone()[0]
+    # Get basic stats in one statement
+    student_count, attempt_count, response_count = conn.execute("""
+        SELECT (SELECT COUNT(*) FROM student),
+               (SELECT COUNT(*) FROM attempt),
+               (SELECT COUNT(*) FROM response)
+    """).fetchone()
     
     # Get category accuracy
     category_stats = conn.execute("""
@@ -556,16 +758,11 @@ def admin_rankings():
     conn = get_db()
     
     rankings = conn.execute("""
-        SELECT s.name, s.email,
-               AVG(a.score_pct) as avg_score,
-               MAX(a.score_pct) as best_score,
-               MIN(a.score_pct) as last_score,
-               COUNT(a.attempt_id) as attempt_count
-        FROM student s
-        LEFT JOIN attempt a ON s.student_id = a.student_id
-        WHERE a.finished_at IS NOT NULL
-        GROUP BY s.student_id
-        ORDER BY avg_score DESC
+        SELECT s.name, s.email, ss.avg_score, ss.best_score, ss.last_score, ss.attempt_count
+        FROM student_summary ss
+        JOIN student s ON s.student_id = ss.student_id
+        WHERE ss.attempt_count > 0
+        ORDER BY ss.avg_score DESC
     """).fetchall()
     
     return render_template('admin_rankings.html', rankings=rankings)
@@ -578,11 +775,10 @@ def admin_questions():
     
     questions = conn.execute("""
         SELECT q.quiz_id, q.question, q.two_category,
-               AVG(r.is_correct) as correct_rate,
-               COUNT(r.response_id) as response_count
+               qs.correct_sum * 1.0 / NULLIF(qs.response_count, 0) as correct_rate,
+               COALESCE(qs.response_count, 0) as response_count
         FROM quiz q
-        LEFT JOIN response r ON q.quiz_id = r.quiz_id
-        GROUP BY q.quiz_id
+        LEFT JOIN question_summary qs ON qs.quiz_id = q.quiz_id
         ORDER BY q.quiz_id
     """).fetchall()
     
@@ -609,6 +805,12 @@ def admin_analytics():
     
     return render_template('admin_analytics.html', response_times=response_times)
 
+@app.route('/admin/reload_quiz_cache', methods=['POST'])
+@lecturer_required
+def reload_quiz_cache():
+    """Reload the quiz bank cache after quiz content is edited."""
+    return jsonify({'ok': True, 'version': invalidate_quiz_cache()})
+
 # --- Error Handlers ---
 @app.errorhandler(404)
 def not_found(error):
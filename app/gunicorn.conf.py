@@ -0,0 +1,8 @@
+import multiprocessing
+
+# Handlers are IO-bound (SQLite + HTTP), so cooperative workers scale better
+# than sync ones. See the "Production Server" section of README.md.
+bind = "0.0.0.0:8000"
+worker_class = "gevent"
+workers = 2 * multiprocessing.cpu_count() + 1
+worker_connections = 1000
@@ -76,5 +76,7 @@ CREATE TABLE IF NOT EXISTS feedback (
 -- Useful indexes
 CREATE INDEX IF NOT EXISTS idx_attempt_student ON attempt(student_id, started_at);
 CREATE INDEX IF NOT EXISTS idx_response_attempt ON response(attempt_id);
+CREATE INDEX IF NOT EXISTS idx_response_student_quiz ON response(student_id, quiz_id);
+CREATE INDEX IF NOT EXISTS idx_attempt_student_finished ON attempt(student_id, finished_at DESC);
 CREATE INDEX IF NOT EXISTS idx_response_quiz ON response(quiz_id);
 CREATE INDEX IF NOT EXISTS idx_quiz_category ON quiz(two_category);
\ No newline at end of file
@@ -213,6 +213,8 @@ def main():
         print("[ATTEMPTS] Created finished attempts for all students")
     
     conn.commit()
+    # Refresh planner statistics so the new indexes are picked up
+    conn.execute("ANALYZE")
     conn.close()
     
     print("\n[SUCCESS] Database reset and seeded successfully!")
@@ -0,0 +1,95 @@
+"""quiz_stats in app_backup stays equal to a fresh GROUP BY over response."""
+
+import importlib.util
+import os
+import pathlib
+import sqlite3
+import tempfile
+
+import pytest
+
+APP_DIR = pathlib.Path(__file__).resolve().parents[1]
+
+# app_backup opens its connection pool at import; keep it off the real database
+_old_db = os.environ.get('PLA_DB')
+os.environ['PLA_DB'] = os.path.join(tempfile.mkdtemp(), 'pla.db')
+try:
+    spec = importlib.util.spec_from_file_location('app_backup_module', APP_DIR / 'app_backup.py')
+    app_backup = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app_backup)  # type: ignore
+finally:
+    if _old_db is None:
+        os.environ.pop('PLA_DB', None)
+    else:
+        os.environ['PLA_DB'] = _old_db
+
+EXPECTED = """
+    SELECT quiz_id, COUNT(*), COALESCE(SUM(score), 0), COALESCE(SUM(response_time_s), 0),
+           SUM(response_time_s > 0),
+           COALESCE(SUM(CASE WHEN response_time_s > 0 THEN response_time_s END), 0)
+    FROM response GROUP BY quiz_id ORDER BY quiz_id
+"""
+
+
+@pytest.fixture
+def conn(tmp_path):
+    db = sqlite3.connect(tmp_path / 'stats.db')
+    db.execute("PRAGMA recursive_triggers=ON")  # as in app_backup._connect
+    db.execute("""
+        CREATE TABLE response (
+            response_id INTEGER PRIMARY KEY, student_id INTEGER NOT NULL, attempt_id INTEGER NOT NULL,
+            quiz_id INTEGER NOT NULL, answer_text TEXT, score INTEGER DEFAULT 0,
+            response_time_s REAL DEFAULT 0, UNIQUE(attempt_id, quiz_id)
+        )
+    """)
+    yield db
+    db.close()
+
+
+def stats(db):
+    return db.execute(
+        "SELECT quiz_id, n, sum_score, sum_time, n_timed, sum_time_timed "
+        "FROM quiz_stats WHERE n > 0 ORDER BY quiz_id"
+    ).fetchall()
+
+
+def answer(db, attempt_id, quiz_id, score, response_time_s, verb='INSERT'):
+    db.execute(
+        f"{verb} INTO response (student_id, attempt_id, quiz_id, answer_text, score, response_time_s) "
+        "VALUES (1, ?, ?, 'x', ?, ?)",
+        (attempt_id, quiz_id, score, response_time_s),
+    )
+
+
+def test_quiz_stats_follows_response_writes(conn):
+    app_backup.ensure_quiz_stats(conn)
+    answer(conn, 1, 1, 1, 4.0)
+    answer(conn, 1, 2, 0, 0)
+    answer(conn, 2, 1, 0, 6.5)
+    assert stats(conn) == conn.execute(EXPECTED).fetchall()
+    assert stats(conn)[0] == (1, 2, 1, 10.5, 2, 10.5)
+
+    # Resubmitting an answer replaces the row: the DELETE half must be counted too
+    answer(conn, 2, 1, 1, 3.0, verb='INSERT OR REPLACE')
+    answer(conn, 1, 2, 1, 2.0, verb='INSERT OR REPLACE')
+    assert stats(conn) == conn.execute(EXPECTED).fetchall()
+    assert stats(conn)[0][:3] == (1, 2, 2)
+
+    conn.execute("UPDATE response SET score = 0, response_time_s = 0 WHERE attempt_id = 1 AND quiz_id = 1")
+    conn.execute("UPDATE response SET quiz_id = 3 WHERE attempt_id = 1 AND quiz_id = 2")
+    conn.execute("DELETE FROM response WHERE attempt_id = 2")
+    assert stats(conn) == conn.execute(EXPECTED).fetchall()
+    assert stats(conn) == [(1, 1, 0, 0.0, 0, 0.0), (3, 1, 1, 2.0, 1, 2.0)]
+
+
+def test_ensure_quiz_stats_backfills_existing_responses(conn):
+    answer(conn, 1, 1, 1, 4.0)
+    answer(conn, 1, 2, 0, 0)
+    answer(conn, 2, 1, 1, 2.5)
+
+    app_backup.ensure_quiz_stats(conn)
+    assert stats(conn) == conn.execute(EXPECTED).fetchall()
+
+    # A second call must not add the backfill again
+    app_backup.ensure_quiz_stats(conn)
+    assert stats(conn) == conn.execute(EXPECTED).fetchall()
@@ -0,0 +1,93 @@
+"""Admin summary tables in app_new stay in step with attempt/response writes."""
+
+import importlib.util
+import pathlib
+import sqlite3
+
+import pytest
+
+APP_DIR = pathlib.Path(__file__).resolve().parents[1]
+spec = importlib.util.spec_from_file_location('app_new_module', APP_DIR / 'app_new.py')
+app_new = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(app_new)  # type: ignore
+
+EXPECTED_STUDENTS = """
+    SELECT a.student_id, COUNT(*), AVG(a.score_pct), MAX(a.score_pct),
+           (SELECT l.score_pct FROM attempt l WHERE l.student_id = a.student_id
+              AND l.finished_at IS NOT NULL ORDER BY l.finished_at DESC, l.attempt_id DESC LIMIT 1)
+    FROM attempt a WHERE a.finished_at IS NOT NULL GROUP BY a.student_id ORDER BY a.student_id
+"""
+EXPECTED_QUESTIONS = """
+    SELECT quiz_id, SUM(is_correct), COUNT(*) FROM response GROUP BY quiz_id ORDER BY quiz_id
+"""
+
+
+@pytest.fixture
+def conn(tmp_path):
+    db = sqlite3.connect(tmp_path / 'summary.db')
+    db.row_factory = sqlite3.Row
+    db.executescript((APP_DIR / 'schema.sql').read_text(encoding='utf-8'))
+    yield db
+    db.close()
+
+
+def students(db):
+    rows = db.execute(
+        "SELECT student_id, attempt_count, avg_score, best_score, last_score "
+        "FROM student_summary WHERE attempt_count > 0 ORDER BY student_id"
+    )
+    return [tuple(r) for r in rows]
+
+
+def questions(db):
+    rows = db.execute(
+        "SELECT quiz_id, correct_sum, response_count FROM question_summary "
+        "WHERE response_count > 0 ORDER BY quiz_id"
+    )
+    return [tuple(r) for r in rows]
+
+
+def add_attempt(db, student_id, finished_at, score_pct):
+    return db.execute(
+        "INSERT INTO attempt (student_id, started_at, finished_at, score_pct) VALUES (?,?,?,?)",
+        (student_id, '2026-10-01 09:00:00', finished_at, score_pct),
+    ).lastrowid
+
+
+def test_student_summary_follows_attempt_writes(conn):
+    app_new.ensure_summaries(conn)
+    add_attempt(conn, 1, '2026-10-01 10:00:00', 78.5)
+    latest = add_attempt(conn, 1, '2026-10-02 10:00:00', 100.0)
+    add_attempt(conn, 2, '2026-10-01 10:00:00', 40.0)
+    open_attempt = add_attempt(conn, 2, None, 0)
+
+    assert students(conn) == [(1, 2, 89.25, 100.0, 100.0), (2, 1, 40.0, 40.0, 40.0)]
+
+    conn.execute(
+        "UPDATE attempt SET finished_at = '2026-10-03 10:00:00', score_pct = 60.0 WHERE attempt_id = ?",
+        (open_attempt,),
+    )
+    assert students(conn)[1] == (2, 2, 50.0, 60.0, 60.0)
+
+    conn.execute("UPDATE attempt SET student_id = 2 WHERE attempt_id = ?", (latest,))
+    conn.execute("DELETE FROM attempt WHERE attempt_id = ?", (open_attempt,))
+    assert students(conn) == [tuple(r) for r in conn.execute(EXPECTED_STUDENTS)]
+    assert students(conn)[0] == (1, 1, 78.5, 78.5, 78.5)
+
+
+def test_question_summary_follows_response_writes(conn):
+    app_new.ensure_summaries(conn)
+    attempt_id = add_attempt(conn, 1, '2026-10-01 10:00:00', 50.0)
+    ids = [
+        conn.execute(
+            "INSERT INTO response (attempt_id, student_id, quiz_id, is_correct) VALUES (?,?,?,?)",
+            (attempt_id, 1, quiz_id, is_correct),
+        ).lastrowid
+        for quiz_id, is_correct in [(1, 1), (1, 0), (2, 1), (3, 0)]
+    ]
+    assert questions(conn) == [(1, 1, 2), (2, 1, 1), (3, 0, 1)]
+
+    conn.execute("UPDATE response SET is_correct = 1 WHERE response_id = ?", (ids[1],))
+    conn.execute("UPDATE response SET quiz_id = 3 WHERE response_id = ?", (ids[2],))
+    conn.execute("DELETE FROM response WHERE response_id = ?", (ids[0],))
+    assert questions(conn) == [tuple(r) for r in conn.execute(EXPECTED_QUESTIONS)]
@@ -0,0 +1,14 @@
+"""Gunicorn entrypoint: ``gunicorn wsgi:app`` (settings in gunicorn.conf.py).
+
+gevent must patch the standard library before Flask, sqlite3 pooling or
+threading are imported, so this file has to stay the first import.
+"""
+from gevent import monkey
+
+monkey.patch_all()
+
+import importlib  # noqa: E402
+import os  # noqa: E402
+
+# PLA_APP selects the application module (e.g. PLA_APP=app_backup)
+app = importlib.import_module(os.environ.get("PLA_APP", "app")).app